@@ -0,0 +1,85 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')) # the shared engine package of Games
+from engine import Engine
+
+# random zones destroy everything inside them after a warning
+class DeathZonesEngine(Engine):
+    meshDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flubuMeshes')
+    mapSize = 60 #40
+    mapOffset = [-20,-20]
+
+    def start(self):
+        # zones for destruction: x, y, r, time
+        self.deathZones = [[self.mapSize/2,self.mapSize/2,5,self.time + 4]]
+
+        # timer, cooldown, cooldownFactor, how many, howManyMore, size, sizeGrowth
+        self.deathZoneParameters = [self.time + 2, 4, 0.97, 1.2, 0.15, 4, 0.4]
+
+    # noone wins, the game runs until it gets closed
+    @property
+    def running(self):
+        return True
+
+    def rules(self, dt):
+        current = self.time
+        mapSize = self.mapSize
+        mapOffset = self.mapOffset
+        deathZoneParameters = self.deathZoneParameters
+
+        for zone in self.deathZones:
+            if(current > zone[3]):
+                self.multiPlayer.destruction(zone[0], zone[1], zone[2], False, self.arena)
+
+        self.deathZones = [x for x in self.deathZones if x[3] > current]
+
+        # timer, cooldown, cooldownFactor, how many, speedupFactor, size, sizeGrowthFactor
+        # time to create new zones
+        if deathZoneParameters[0] < current:
+            # how many
+            n = round(deathZoneParameters[3])
+
+            # how big
+            r = deathZoneParameters[5]
+
+            # when
+            t = deathZoneParameters[1]
+
+            # zones for destruction: x, y, r, time
+            newZones = [[self.random.uniform(0,mapSize) + mapOffset[0],
+                        self.random.uniform(0,mapSize) + mapOffset[1],
+                        r/2 + self.random.uniform(0, r/2),
+                         current + 4
+                        ] for i in range(n)]
+
+            self.deathZones += newZones
+
+            # prepare next round
+            self.deathZoneParameters = [current + deathZoneParameters[1],
+                                    max(1,deathZoneParameters[1] * deathZoneParameters[2]),
+                                    deathZoneParameters[2],
+                                    deathZoneParameters[3] + deathZoneParameters[4],
+                                    deathZoneParameters[4],
+                                    deathZoneParameters[5] + deathZoneParameters[6],
+                                    deathZoneParameters[6]]
+
+
+        if self.frames % 10 == 0:
+            self.multiPlayer.killBorders(mapOffset[0], mapOffset[1], mapSize, self.arena)
+
+
+# play a match without window and network as fast as possible
+if __name__ == "__main__":
+    import time
+    import taichi as ti
+    from engine import inputs, profiler
+
+    frameProfiler = profiler.from_args(sys.argv[1:])
+    ti.init(arch=ti.cpu, offline_cache=True)
+
+    engine = DeathZonesEngine(20, inputs.BotInput(seed=0), seed=0, profiler=frameProfiler)
+    start = time.perf_counter()
+    engine.run(120)
+    took = time.perf_counter() - start
+    print(f"{engine.frames} frames, {engine.time:.1f}s game time in {took:.2f}s, {engine.frames/took:.1f} frames/s")
+    frameProfiler.finish()
@@ -0,0 +1,45 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')) # the shared engine package of Games
+from engine import Engine
+
+# stay inside the shrinking ring and watch out for bombs
+class SumoEngine(Engine):
+    meshDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flubuMeshes')
+    mapSize = 60 #40
+    mapOffset = [-30,-30]
+
+    def start(self):
+        # bomb: explosionTime, x, y
+        self.bomb = [self.time + 7, 0,0]
+
+        # radius
+        self.sumoRing = self.mapSize/2
+
+    def rules(self, dt):
+        if self.frames%20 == 0:
+            self.multiPlayer.destruction(self.mapOffset[0] + self.mapSize/2, self.mapOffset[1] + self.mapSize/2, self.sumoRing, True, self.arena)
+
+        self.sumoRing -= 1.6 * dt
+
+        # if bomb explodes
+        if(self.time > self.bomb[0]):
+            self.multiPlayer.bombExplosion(*self.bomb[1:], self.arena)
+            self.bomb = [self.time + 6, self.random.uniform(-self.sumoRing, self.sumoRing), self.random.uniform(-self.sumoRing, self.sumoRing)]
+
+
+# play a match without window and network as fast as possible
+if __name__ == "__main__":
+    import time
+    import taichi as ti
+    from engine import inputs, profiler
+
+    frameProfiler = profiler.from_args(sys.argv[1:])
+    ti.init(arch=ti.cpu, offline_cache=True)
+
+    engine = SumoEngine(20, inputs.BotInput(seed=0), seed=0, profiler=frameProfiler)
+    start = time.perf_counter()
+    engine.run(120)
+    took = time.perf_counter() - start
+    print(f"{engine.frames} frames, {engine.time:.1f}s game time in {took:.2f}s, {engine.frames/took:.1f} frames/s")
+    frameProfiler.finish()
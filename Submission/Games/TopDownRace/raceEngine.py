@@ -0,0 +1,90 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')) # the shared engine package of Games
+from engine import Engine
+
+# the map scrolls to the right, dodge the hurdles and do not fall behind
+class RaceEngine(Engine):
+    meshDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flubuMeshes')
+    mapSize = 60 #40
+    mapOffset = [-30,-30]
+    speed = 2100.0
+
+    def start(self):
+        self.raceSpeed = 5
+
+        # hurdles: [[x, y, r]]
+        self.hurdles = [[self.mapOffset[0] + self.mapSize + 5, self.mapOffset[1] + self.mapSize / 2, 3]]
+        self.upload_hurdles()
+
+        # [time, radius]
+        self.nextHurdle = [self.time + 3, 3]
+
+    # flush the hurdles to the sim
+    def upload_hurdles(self):
+        self.multiPlayer.set_hurdles(self.arena, self.hurdles)
+
+    def eliminated(self, p):
+        self.nextHurdle[0] += 0.5
+
+    def rules(self, dt):
+        current = self.time
+        mapSize = self.mapSize
+        mapOffset = self.mapOffset
+
+        # draw and respawn hurdles
+        # hurdles: [[x, y, r]]
+
+        # check if hurdles got changed
+        changed = False
+
+        # check if any hurdles have to be deleted
+        for i in range(len(self.hurdles)):
+            if (self.hurdles[i][0] + self.hurdles[i][2] <= mapOffset[0]):
+                changed = True
+                break
+
+        # add new hurdles
+        if current > self.nextHurdle[0]:
+            n = 1 + int(self.random.uniform(0,6))
+
+            xStart = self.random.uniform(0, mapSize - self.nextHurdle[1] * n)
+            self.hurdles += [[mapOffset[0] + mapSize + 5, mapOffset[1] + xStart + self.nextHurdle[1] * 1.2 * x, self.nextHurdle[1]] for x in range(n)]
+
+            changed = True
+            self.nextHurdle = [current + self.random.uniform(0.5,2.5), min(self.nextHurdle[1] + 0.13, 6.5)]
+
+        # flush changes to sim
+        if changed:
+            self.hurdles = [h for h in self.hurdles if h[0]+h[2] > mapOffset[0]]
+            self.upload_hurdles()
+
+        # kill everyone Outside
+        if self.frames % 20 == 0:
+            self.multiPlayer.killBorders(mapOffset[0], mapOffset[1], mapSize, self.arena)
+
+        mapOffset[0] += dt * self.raceSpeed
+
+        if self.raceSpeed < 30: # warmup
+            self.raceSpeed *= (1 + dt*2)
+        elif self.raceSpeed < 85: # max speed
+            self.raceSpeed += dt * 10
+        else: #if raceSpeed < 100:
+            self.raceSpeed += dt * 2
+
+
+# play a match without window and network as fast as possible
+if __name__ == "__main__":
+    import time
+    import taichi as ti
+    from engine import inputs, profiler
+
+    frameProfiler = profiler.from_args(sys.argv[1:])
+    ti.init(arch=ti.cpu, offline_cache=True)
+
+    engine = RaceEngine(20, inputs.BotInput(seed=0), seed=0, profiler=frameProfiler)
+    start = time.perf_counter()
+    engine.run(120)
+    took = time.perf_counter() - start
+    print(f"{engine.frames} frames, {engine.time:.1f}s game time in {took:.2f}s, {engine.frames/took:.1f} frames/s")
+    frameProfiler.finish()
@@ -0,0 +1,3 @@
+# the headless engine shared by all games: simulation, input, profiling and drawing
+# the games import the modules they need, eg. from engine import inputs, and subclass Engine with their rules
+from .core import Engine, FixedStep, Arenas, load_mesh
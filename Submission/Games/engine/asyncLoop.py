@@ -0,0 +1,69 @@
+import time
+import asyncio
+import argparse
+import pyglet
+import ujson as json
+
+# runs a game on one asyncio event loop instead of pyglet.app.run and the request threads
+# the pyglet clock, and with it the draw callback, is ticked from a coroutine
+# the input source and the telemetry are coroutines next to it, no thread competes with the frames
+# the game rules keep their timers on the game time of the engine, so headless runs and replays stay the same
+
+# pyglet's event loop as a coroutine, returns once the game exits or the window is closed
+async def run_pyglet(maxFps=None):
+    eventLoop = pyglet.app.event_loop
+    eventLoop.has_exit = False
+    while not eventLoop.has_exit and pyglet.app.windows:
+        start = time.perf_counter()
+
+        pyglet.app.platform_event_loop.dispatch_posted_events()
+        for window in list(pyglet.app.windows):
+            window.dispatch_events()
+
+        pyglet.clock.tick() # calls draw
+        for window in list(pyglet.app.windows):
+            window.switch_to()
+            window.dispatch_event('on_draw')
+            window.flip()
+
+        # give the other coroutines their turn, also when the frame took longer than it should
+        wait = start + 1/maxFps - time.perf_counter() if maxFps else 0
+        await asyncio.sleep(max(0, wait))
+
+# sends the state of the game as a json datagram every interval seconds, eg. to a dashboard
+# a datagram is skipped instead of queued if the last one is still not sent
+async def publish_telemetry(engine, address, interval=1.0):
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=address)
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            if transport.get_write_buffer_size() == 0:
+                transport.sendto(json.dumps({
+                    "time": engine.time,
+                    "frames": engine.frames,
+                    "alive": sum(engine.playerAlive),
+                    "fps": pyglet.clock.get_fps(),
+                }).encode())
+    finally:
+        transport.close()
+
+async def main(engine, inputSource, args):
+    tasks = [asyncio.create_task(inputSource.run())]
+    if args.telemetry:
+        host, port = args.telemetry.rsplit(':', 1)
+        tasks.append(asyncio.create_task(publish_telemetry(engine, (host, int(port)))))
+
+    try:
+        await run_pyglet(args.maxFps)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+# use instead of pyglet.app.run, with the draw callback already scheduled on the pyglet clock
+def run(engine, inputSource, argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--telemetry', metavar='HOST:PORT', help="send the game state as json over udp every second")
+    parser.add_argument('--max-fps', dest='maxFps', type=float, help="sleep between frames instead of drawing as fast as possible")
+    args, unknown = parser.parse_known_args(argv)
+    asyncio.run(main(engine, inputSource, args))
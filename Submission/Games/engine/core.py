@@ -0,0 +1,282 @@
+import os
+import random
+import numpy as np
+from . import multiplayer as mpl
+from .profiler import Profiler
+
+def load_mesh(path):
+    with open(path, 'rb') as f:
+        points = np.load(f)
+        links = np.load(f)
+    return points, links
+
+# headless game: simulation, game rules, elimination and input without any window
+# the games subclass it and override start, rules and eliminated
+# needs ti.init to be called before creating it
+class Engine:
+    mesh = 'bigRoundRested.npy' # or a list of meshes, player p gets mesh[p % len(mesh)]
+    meshDir = 'flubuMeshes' # the games set their own folder
+    mapSize = 60
+    mapOffset = [-30,-30]
+    speed = 1500.0
+    epochs = 10 # balance stability with performance
+    fused = None # True runs the substeps of a frame in one kernel, False with parallel passes, None picks by the sim size
+    timeScale = 1000 * 0.0001667 # simulation dt per second of game time
+    inputBlend = 0.05 # game seconds a new input takes to fully apply, smooths the 8 Hz steps of the phones
+    dropIn = False # players join when a phone takes their slot and leave when it disconnects
+
+    # multiPlayer, arena and input are passed by Arenas to run the engine inside a batch
+    def __init__(self, players: int, inputSource, seed=None, multiPlayer=None, arena=0, input=None, profiler=None):
+        self.players = players
+        self.inputSource = inputSource
+        self.profiler = Profiler(enabled=False) if profiler is None else profiler # times the phases of step
+        self.random = random.Random(seed)
+        self.mapOffset = list(self.mapOffset) # moving maps change it
+
+        # the big boy
+        if multiPlayer is None:
+            multiPlayer = self.create_sim(players, passes=self.profiler.passes)
+        self.multiPlayer = multiPlayer
+        self.arena = arena
+        self.firstPlayer = arena * players # first player of the arena in the sim
+
+        # array to store all inputs in
+        self.input = np.zeros((players, 2), dtype=np.float32) if input is None else input
+        self.playerColors = inputSource.colors(players)
+        self.multiPlayer.set_colors(self.firstPlayer, self.playerColors)
+        self.playerAlive = [True for x in range(players)] # wether player counts as alive
+        self.connected = np.ones(players, dtype=bool) # slots with a player, only changes with dropIn
+
+        self.time = 0.0 # game time in seconds, all game timers use this
+        self.frames = 0
+
+        self.start()
+
+    # sim with the mesh of the game placed in every arena, passes also compiles the kernels the profiled passes need
+    @classmethod
+    def create_sim(cls, players, arenas=1, passes=False):
+        names = [cls.mesh] if isinstance(cls.mesh, str) else cls.mesh
+        loaded = {name: load_mesh(os.path.join(cls.meshDir, name)) for name in set(names)}
+        meshes = [loaded[names[p % len(names)]] for p in range(players)]
+        multiPlayer = mpl.MultiPlayer(playerCount=players, speed=cls.speed, arenas=arenas,
+                                      inputBlend=cls.inputBlend * cls.timeScale, meshes=meshes, fused=cls.fused)
+        multiPlayer.init(cls.mapSize, cls.mapOffset[0], cls.mapOffset[1])
+        multiPlayer.warm_up(passes) # no compile hitch in the first frames or the next rounds
+        return multiPlayer
+
+    # set up the game specific state
+    def start(self):
+        pass
+
+    # game rule tick, runs before input and simulation
+    def rules(self, dt):
+        pass
+
+    # called once a player got killed
+    def eliminated(self, p):
+        pass
+
+    # with dropIn the round waits in the lobby until a phone takes a slot
+    @property
+    def lobby(self):
+        return self.dropIn and not self.connected.any()
+
+    # the game is over once noone is left, empty slots of the lobby do not end it
+    @property
+    def running(self):
+        return self.lobby or any(self.playerAlive)
+
+    # start a new frame, returns the simulation dt for the passed real time
+    def begin_frame(self, seconds):
+        self.frames += 1
+        self.time += seconds
+
+        # calculate dt from time since last frame
+        dt = seconds * self.timeScale
+
+        if dt > 0.02: # slowdown if under 30 fps
+            dt = 0.02 # keep the matrix from glitching
+
+            # ░░░░░░░░░░░░░░░░░░░░░░░░░░░░░░░
+            # ▀█▄░▄█░░░█▄▄▐▀█▀▌▐▀█░▀█░▀█▄░▐▀░
+            # ░█▐█▀▐░░▐▄██░░▌░░▐▄▌░░▌░░░██▀░░
+            # ░█░▌░▐░░▌▀██░░▌░░▐▀▄░░▌░▐▀░▀█▄░
+            # ▄▌░░░▀░▀░░▀▀░▀▀▀░▀░▀▀░▀░▀░░░░▀▀
+            # ░░░░░░░░░░▄▄▄▄▄▄░░░░░░░░░░░░░░░
+            # ░░░░░░░░████▀▀███░░░░░░░░░░░░░░
+            # ░░░░░░░███░░░░░▀██░░░░░░░░░░░░░
+            # ░░░░░░░███▄░▄▄▄▄██░░░░░░░░░░░░░
+            # ░░░░░░░████▀▀████▀░░░░░░░░░░░░░
+            # ░░░░░░░██▄█▄▄░░░░░░░░░░░░░░░░░░
+            # ░░░░░░░░████▄▄░░░░░░░░░░░░░░░░░
+            # ░░░░░░░░░██▀░░▄█▄░░░░░░░░░░░░░░
+            # ░░░░░░░░░████████▄░░░░░░░░░░░░░
+            # ░░░░░░░░░█████████▄▄▄▄░░░░░░░░░
+            # ░░░░░░░░▄████████████████▄▄░░░░
+            # ░░░░░░▄████████████████████░░░░
+            # ░░░▄████████████████████████░░░
+            # ░░██████████████████████████▄░░
+            # ░████████████████████████████░░
+            # ░████████████████████████████░░
+            # ░█████████████████████████████░
+            # ░█████████████████████████████░
+            # ██████████████████████████████░
+            # ░░░░░░░░░░░░░░░░░░░░░░░░░░░░░░░
+
+        return dt
+
+    def read_input(self):
+        self.inputSource.poll(self.input)
+        self.update_slots()
+        self.multiPlayer.set_input(self.input)  # update the player controller map
+
+    # with dropIn, spawn the players whose phone connected since the last poll and remove the ones that left
+    def update_slots(self):
+        connected = self.inputSource.connected
+        if not self.dropIn or connected is None:
+            return
+        lobby = self.lobby
+        for p in np.flatnonzero(connected[:self.players] != self.connected):
+            if connected[p]:
+                self.join(p)
+            else:
+                self.leave(p)
+        if lobby and not self.lobby: # the first phone starts a fresh round, the timers did run on in the lobby
+            self.restart()
+
+    # spawn player p at the free spot of the map, the slot of the sim gets reused without new kernels
+    def join(self, p):
+        self.multiPlayer.spawn(self.firstPlayer + p, *self.free_spot())
+        self.playerAlive[p] = True
+        self.connected[p] = True
+
+    # take player p out of the match
+    def leave(self, p):
+        self.multiPlayer.killPlayer(self.firstPlayer + p)
+        self.playerAlive[p] = False
+        self.connected[p] = False
+
+    # the spawn point of the arena farthest away from all alive players, moves with the map
+    def free_spot(self):
+        spots = self.multiPlayer.spawnPoints[self.firstPlayer:self.firstPlayer + self.players]
+        spots = spots + np.subtract(self.mapOffset, type(self).mapOffset)
+        centers = self.multiPlayer.hostCenters[self.firstPlayer:self.firstPlayer + self.players]
+        centers = centers[np.array(self.playerAlive)]
+        if len(centers) == 0:
+            return spots[0]
+        distances = np.linalg.norm(spots[:, np.newaxis] - centers[np.newaxis], axis=2)
+        return spots[np.argmax(distances.min(axis=1))]
+
+    # start the next round in the same sim, every connected player gets respawned at its start
+    def restart(self):
+        self.mapOffset[:] = type(self).mapOffset
+        for p in range(self.players):
+            if self.connected[p]:
+                self.multiPlayer.spawn(self.firstPlayer + p, *self.multiPlayer.spawnPoints[self.firstPlayer + p])
+            else:
+                self.multiPlayer.killPlayer(self.firstPlayer + p)
+            self.playerAlive[p] = bool(self.connected[p])
+        self.start()
+
+    def simulate(self, dt):
+        dt = dt/self.epochs # adapt dt to #epochs
+        if self.profiler.enabled and self.profiler.passes: # same simulation, every pass launched and timed on its own
+            if not self.multiPlayer.passesCompiled:
+                self.profiler.skip_open() # turned on while playing, this frame compiles the passes
+            self.profiler.add(self.multiPlayer.advance_passes(dt, self.epochs))
+        else:
+            self.multiPlayer.advance_frame(dt, self.epochs)  # advance the simulation by all epochs
+        self.eliminate(self.multiPlayer.hostVertsActive)
+
+    # Kill players that should be dead
+    def eliminate(self, playerVertAlive):
+        playerVertAlive = playerVertAlive[self.firstPlayer:self.firstPlayer + self.players]
+        for p in range(self.players):
+            if self.playerAlive[p]:
+                if playerVertAlive[p] < 5:
+                    print(f"Eliminated Player {p}")
+                    self.playerAlive[p] = False
+                    self.multiPlayer.killPlayer(self.firstPlayer + p)
+                    self.eliminated(p)
+
+    # one whole frame, the frontends call the phases themselves to time them
+    def step(self, seconds):
+        dt = self.begin_frame(seconds)
+        with self.profiler.phase('RULES'):
+            self.rules(dt)
+        with self.profiler.phase('INP'):
+            self.read_input()
+        with self.profiler.phase('SIM'):
+            self.simulate(dt)
+
+    # step as fast as possible with a fixed frame time, e.g. without a window
+    def run(self, maxSeconds, frameSeconds=1/60):
+        while self.running and self.time < maxSeconds:
+            self.step(frameSeconds)
+
+
+# decouples the simulation from the rendered frames
+# the engine is stepped with a fixed tick, render frames get the positions interpolated between the last two ticks
+# hz 0 steps once per rendered frame with the frame time instead
+class FixedStep:
+    def __init__(self, engine, hz=60, maxSteps=4):
+        self.engine = engine
+        self.tickSeconds = 1/hz if hz else 0
+        self.maxSteps = maxSteps # catch up at most this many ticks per frame
+        self.accumulator = 0.0
+
+    # step all due ticks for the passed real time, returns the number of ticks
+    def update(self, seconds):
+        if not self.tickSeconds:
+            self.engine.step(seconds)
+            self.engine.multiPlayer.interpolate(1.0)
+            return 1
+
+        self.accumulator += seconds
+        steps = 0
+        while self.accumulator >= self.tickSeconds and steps < self.maxSteps:
+            self.engine.step(self.tickSeconds)
+            self.accumulator -= self.tickSeconds
+            steps += 1
+
+        # too slow to catch up, drop the backlog and let the game slow down instead
+        if self.accumulator >= self.tickSeconds:
+            self.accumulator = 0.0
+
+        self.engine.multiPlayer.interpolate(self.accumulator / self.tickSeconds)
+        return steps
+
+
+# many independent matches of one game in a single MultiPlayer, simulated by the same kernel launches
+class Arenas:
+    def __init__(self, engineClass, arenas: int, players: int, inputSources, seed=None):
+        self.multiPlayer = engineClass.create_sim(players, arenas)
+        self.input = np.zeros((arenas * players, 2), dtype=np.float32)
+        self.engines = [engineClass(players, inputSources[a],
+                                    seed=None if seed is None else seed + a,
+                                    multiPlayer=self.multiPlayer, arena=a,
+                                    input=self.input[a*players:(a+1)*players]) for a in range(arenas)]
+        self.epochs = engineClass.epochs
+
+    @property
+    def running(self):
+        return any(engine.running for engine in self.engines)
+
+    def step(self, seconds):
+        dt = 0
+        for engine in self.engines:
+            dt = engine.begin_frame(seconds)
+            if engine.running:
+                engine.rules(dt)
+            engine.inputSource.poll(engine.input)
+            engine.update_slots()
+        self.multiPlayer.set_input(self.input)
+
+        # many arenas make a big sim, which gets parallel passes on more than one core
+        self.multiPlayer.advance_frame(dt/self.epochs, self.epochs)
+        for engine in self.engines:
+            engine.eliminate(self.multiPlayer.hostVertsActive)
+
+    def run(self, maxSeconds, frameSeconds=1/60):
+        while self.running and self.engines[0].time < maxSeconds:
+            self.step(frameSeconds)
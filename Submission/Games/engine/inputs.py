@@ -0,0 +1,357 @@
+import time
+import socket
+import argparse
+import asyncio
+import urllib.parse
+import numpy as np
+from requests_futures.sessions import FuturesSession
+import ujson as json
+
+defaultColor = [0,0,255]
+
+# record the input server pushes per player, see PUSH_ADDR in InputServer/app/main.go
+# x and y are scaled by 127, time is the unix time of the last input of the player
+inputRecord = np.dtype([('id', '<u2'), ('x', 'i1'), ('y', 'i1'), ('time', '<f8')])
+
+# player colors from the roster of the input server
+def roster_colors(roster, players):
+    colors = []
+    for p in range(players):
+        h = roster[p]["color"].lstrip('#')
+        colors.append(list(int(h[i:i+2], 16) for i in (0, 2, 4)))
+    return colors
+
+# x, y of an input string from a phone, None if it is not "x,y"
+def parse_input(text):
+    try:
+        x, y = (float(v) for v in text.split(','))
+        return x, y
+    except ValueError:
+        return None
+
+# write the inputs of a roster response from the input server into the input array
+# all players are parsed in one go, returns which players sent an input in the last 3 seconds, the others are set to 0
+def decode_roster(body, input):
+    roster = json.loads(body)[:input.shape[0]]
+    n = len(roster)
+    fresh = np.zeros(input.shape[0], dtype=bool)
+    fresh[:n] = np.fromiter((player["lastInput"] for player in roster), np.int64, n) > time.time() - 3
+
+    # fresh players without an input keep their last one
+    texts = [player["input"] for player in roster]
+    update = np.flatnonzero(fresh[:n] & np.fromiter(map(bool, texts), bool, n))
+    # every text needs exactly one comma, else a short and a long text could add up to the right count
+    # and the values would shift between players
+    commas = np.fromiter((texts[p].count(',') for p in update), np.int64, len(update))
+    xy = None
+    if np.all(commas == 1):
+        try:
+            xy = np.fromstring(','.join(texts[p] for p in update), dtype=np.float32, sep=',')
+        except ValueError:
+            pass
+    if xy is None or xy.size != 2 * len(update):
+        # someone sent garbage, parse one by one and skip it
+        pairs = [parse_input(texts[p]) for p in update]
+        update = update[[pair is not None for pair in pairs]]
+        xy = np.array([pair for pair in pairs if pair is not None], dtype=np.float32).reshape(-1)
+
+    input[update, 0] = xy[0::2]
+    input[update, 1] = -xy[1::2]
+    input[~fresh] = 0
+    return fresh
+
+# where the engine gets the player inputs from
+# poll fills the preallocated (players, 2) float32 array with x, y in [-1, 1] and must never block
+# players that have no new input keep their last one
+class InputSource:
+    connected = None # bool per player that has a phone on the slot, None if the source can not tell
+
+    def colors(self, players):
+        return [list(defaultColor) for i in range(players)]
+
+    def poll(self, input):
+        raise NotImplementedError
+
+    # hook into the game window once it exists, eg. for keyboard events
+    def attach(self, window):
+        pass
+
+    # background work on the asyncio loop of the game, only runs with asyncLoop.py
+    async def run(self):
+        pass
+
+    # the game is over
+    def close(self):
+        pass
+
+# every player stands still, needs no network
+class IdleInput(InputSource):
+    def poll(self, input):
+        pass
+
+# polls the input server, the next request is sent as soon as the last one is done
+class HttpInput(InputSource):
+    def __init__(self, url='https://input.yellowtech.ch/input'):
+        self.url = url
+        self.session = FuturesSession(max_workers=4)
+        self.request = self.session.get(self.url)
+
+        # wait for request to finish to get count and colors
+        self.roster = json.loads(self.request.result().content)
+
+    def colors(self, players):
+        return roster_colors(self.roster, players)
+
+    def poll(self, input):
+        if self.request.done():
+            body = self.request.result().content
+            self.request = self.session.get(self.url)
+            self.connected = decode_roster(body, input)
+
+# polls the input server from a coroutine on the asyncio loop of the game (asyncLoop.py) instead of threads
+# one keep-alive connection and one request in flight, poll applies only the newest roster
+class AsyncHttpInput(InputSource):
+    def __init__(self, url='https://input.yellowtech.ch/input', interval=0.0):
+        self.url = urllib.parse.urlsplit(url)
+        self.interval = interval # minimum seconds between requests, 0 requests again once the last one is done
+        self.request = (f"GET {self.url.path or '/'}{'?' + self.url.query if self.url.query else ''} HTTP/1.1\r\n"
+                        f"Host: {self.url.hostname}\r\nConnection: keep-alive\r\n\r\n").encode()
+        self.latest = None # newest roster response not applied yet
+
+        # the colors are needed before the loop runs
+        self.roster = json.loads(FuturesSession().get(url).result().content)
+
+    def colors(self, players):
+        return roster_colors(self.roster, players)
+
+    async def connect(self):
+        secure = self.url.scheme == 'https'
+        port = self.url.port or (443 if secure else 80)
+        return await asyncio.open_connection(self.url.hostname, port, ssl=True if secure else None)
+
+    # one request on an open connection, returns the body and wether the server keeps the connection
+    async def fetch(self, reader, writer):
+        writer.write(self.request)
+        await writer.drain()
+
+        status = await reader.readline()
+        if not status.startswith(b'HTTP/1.1 200'):
+            raise ConnectionError(status.decode('latin-1').strip() or "connection closed")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip().lower()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass # trailers
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b''.join(chunks)
+        else:
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+        return body, headers.get('connection') != 'close'
+
+    async def run(self):
+        writer = None
+        while True:
+            try:
+                reader, writer = await self.connect()
+                keepAlive = True
+                while keepAlive:
+                    start = time.perf_counter()
+                    body, keepAlive = await self.fetch(reader, writer)
+                    self.latest = body
+                    if self.interval:
+                        await asyncio.sleep(max(0, start + self.interval - time.perf_counter()))
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+                print(f"Input connection lost: {e}")
+                await asyncio.sleep(1)
+            finally:
+                if writer is not None:
+                    writer.close()
+                    writer = None
+
+    def poll(self, input):
+        if self.latest is not None:
+            self.connected = decode_roster(self.latest, input)
+            self.latest = None
+
+# the input server pushes the inputs of all players over udp as soon as one changes
+# poll only reads what already arrived, no request and no json per frame
+# the roster for the colors is still fetched once over http if a url is given
+class UdpInput(InputSource):
+    def __init__(self, port=9999, host='0.0.0.0', rosterUrl=None):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.setblocking(False)
+        self.lastInput = None # time of the newest applied record per player
+
+        self.roster = None
+        if rosterUrl is not None:
+            self.roster = json.loads(FuturesSession().get(rosterUrl).result().content)
+
+    def colors(self, players):
+        if self.roster is None:
+            return super().colors(players)
+        return roster_colors(self.roster, players)
+
+    # all datagrams that are waiting, joined into one buffer
+    def receive(self):
+        datagrams = []
+        while True:
+            try:
+                datagram = self.socket.recv(65536)
+            except BlockingIOError:
+                break
+            datagrams.append(datagram[:len(datagram) - len(datagram) % inputRecord.itemsize])
+        return b''.join(datagrams)
+
+    def poll(self, input):
+        if self.lastInput is None or len(self.lastInput) != input.shape[0]:
+            self.lastInput = np.zeros(input.shape[0])
+
+        records = np.frombuffer(self.receive(), dtype=inputRecord)
+        records = records[records['id'] < input.shape[0]]
+        records = records[np.argsort(records['time'], kind='stable')] # newest last, it wins the assignment
+        records = records[records['time'] >= self.lastInput[records['id']]] # drop reordered old datagrams
+
+        ids = records['id']
+        input[ids, 0] = records['x'] / 127
+        input[ids, 1] = -records['y'] / 127
+        self.lastInput[ids] = records['time']
+
+        # no input for 3 seconds
+        self.connected = self.lastInput > time.time() - 3
+        input[~self.connected] = 0
+
+    def close(self):
+        self.socket.close()
+
+# players on the local keyboard, one set of up, down, left, right keys per player
+# the first players are controlled by the keyboard, the rest stand still
+class KeyboardInput(InputSource):
+    def __init__(self, keymaps=None):
+        from pyglet.window import key # only needed with a window
+
+        if keymaps is None:
+            keymaps = [(key.W, key.S, key.A, key.D), (key.UP, key.DOWN, key.LEFT, key.RIGHT)]
+        self.keymaps = keymaps
+        self.keys = key.KeyStateHandler()
+
+    def attach(self, window):
+        window.push_handlers(self.keys)
+
+    def poll(self, input):
+        for p, (up, down, left, right) in enumerate(self.keymaps[:input.shape[0]]):
+            input[p] = [self.keys[right] - self.keys[left], self.keys[up] - self.keys[down]]
+
+# synthetic players that wander around with a smooth random walk of the stick
+# no latency and reproducible with a seed, for benchmarks and tests
+class BotInput(InputSource):
+    def __init__(self, seed=None, turn=0.3, strength=1.0):
+        self.random = np.random.default_rng(seed)
+        self.turn = turn # radians the stick turns per poll
+        self.strength = strength
+        self.angle = None
+
+    def poll(self, input):
+        if self.angle is None or len(self.angle) != input.shape[0]:
+            self.angle = self.random.uniform(0, 2*np.pi, input.shape[0])
+        self.angle += self.random.normal(0, self.turn, input.shape[0])
+        input[:, 0] = np.cos(self.angle) * self.strength
+        input[:, 1] = np.sin(self.angle) * self.strength
+
+# plays back a file written by RecordInput, one recorded poll per poll
+# stands still once the recording is over
+class ReplayInput(InputSource):
+    def __init__(self, path):
+        with np.load(path) as recording:
+            self.inputs = recording['inputs']
+            self.recordedColors = recording['colors'].tolist()
+        self.frame = 0
+
+    def colors(self, players):
+        return self.recordedColors[:players] + super().colors(players)[len(self.recordedColors):]
+
+    @property
+    def done(self):
+        return self.frame >= len(self.inputs)
+
+    def poll(self, input):
+        if self.done:
+            input[:] = 0
+            return
+        players = min(input.shape[0], self.inputs.shape[1])
+        input[:players] = self.inputs[self.frame, :players]
+        self.frame += 1
+
+# records every poll of another source, close writes them for ReplayInput
+class RecordInput(InputSource):
+    def __init__(self, source, path):
+        self.source = source
+        self.path = path
+        self.inputs = []
+        self.recordedColors = []
+
+    def colors(self, players):
+        self.recordedColors = self.source.colors(players)
+        return self.recordedColors
+
+    def attach(self, window):
+        self.source.attach(window)
+
+    async def run(self):
+        await self.source.run()
+
+    @property
+    def connected(self):
+        return self.source.connected
+
+    def poll(self, input):
+        self.source.poll(input)
+        self.inputs.append(input.copy())
+
+    def close(self):
+        self.source.close()
+        np.savez(self.path, inputs=np.array(self.inputs, dtype=np.float32), colors=np.array(self.recordedColors))
+
+# input source picked on the command line of the games, the input server by default
+# --record can be combined with any of them
+def from_args(argv):
+    parser = argparse.ArgumentParser()
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--udp', action='store_true', help="inputs pushed by the input server (PUSH_ADDR) or InputServer/udpPusher.py")
+    source.add_argument('--keyboard', action='store_true', help="WASD and the arrow keys for the first two players")
+    source.add_argument('--bots', action='store_true', help="synthetic players")
+    source.add_argument('--replay', metavar='FILE', help="play back a recording")
+    parser.add_argument('--record', metavar='FILE', help="record the inputs, written when the game is closed")
+    parser.add_argument('--async', dest='useAsync', action='store_true', help="poll the input server from the asyncio loop")
+    parser.add_argument('--url', default='https://input.yellowtech.ch/input', help="input server, eg. InputServer/inputServer.py on http://localhost:8080/input")
+    args, unknown = parser.parse_known_args(argv)
+
+    if args.udp:
+        inputSource = UdpInput()
+    elif args.keyboard:
+        inputSource = KeyboardInput()
+    elif args.bots:
+        inputSource = BotInput()
+    elif args.replay:
+        inputSource = ReplayInput(args.replay)
+    elif args.useAsync:
+        inputSource = AsyncHttpInput(args.url)
+    else:
+        inputSource = HttpInput(args.url)
+
+    if args.record:
+        inputSource = RecordInput(inputSource, args.record)
+    return inputSource
@@ -0,0 +1,785 @@
+import time
+import numpy as np
+import taichi as ti
+
+zero = ti.Vector([0.0, 0.0])
+
+@ti.data_oriented
+class MultiPlayer:
+    fusedVerts = 1000 # sims with more verts run the passes of a frame in parallel, when taichi has more than one cpu thread
+
+    def __init__(self, playerCount: int = 1, speed: float = 1500.0, damping: float = 15.0,
+                 gridCollision: bool = True, arenas: int = 1, inputBlend: float = 0.0, meshes=None, fused=None,
+                 vertCapacity: int = 0, linkCapacity: int = 0):
+        # independent matches simulated side by side, players of different arenas never collide
+        # arena a owns the players a*arenaPlayers until (a+1)*arenaPlayers
+        self.arenas = ti.static(arenas)
+        self.arenaPlayers = ti.static(playerCount) # players per arena
+        self.playerCount = ti.static(playerCount * arenas)
+
+        self.speed = speed
+        self.damping = damping
+        self.spring = 3000
+        
+        self.radius = 1 # normal distance of springs
+        self.collRadius = 0.95 # self and intercollision distance of vertices
+
+        # a new input is blended in over inputBlend simulation seconds instead of jumping at one substep
+        # only the two samples needed for that stay on the device, the control of the substep is computed there
+        self.inputBlend = ti.static(inputBlend)
+        self.input = ti.Vector.field(2, float, self.playerCount) # newest inputs
+        self.inputFrom = ti.Vector.field(2, float, self.playerCount) # control when the newest input arrived
+        self.inputAge = ti.field(float, self.playerCount) # simulation time since the newest input arrived
+        self.control = ti.Vector.field(2, float, self.playerCount) # blended input of the current substep
+        self.lastInput = np.zeros((self.playerCount, 2), dtype=np.float32) # host copy of the last upload
+        self.passesCompiled = False # advance_passes was called before
+        self.launchCost = 0.0 # seconds of an idle launch, measured by the first advance_passes
+
+        # meshes are [(points, links)], one per player of an arena or one for everyone, every arena gets the same
+        # player p owns the verts vertStarts[p] until vertStarts[p+1] and the links linkStarts[p] until linkStarts[p+1]
+        if meshes is None:
+            meshes = [self.roundMesh()]
+        self.meshes, self.vertStarts, self.linkStarts = self.layout(meshes)
+
+        # the fields hold vertCount verts and linkCount links, the kernels are compiled for these sizes
+        # the capacities leave room for bigger meshes, set_meshes switches to them without compiling again
+        # the verts and links behind the meshes stay disabled
+        self.vertCount = ti.static(max(int(self.vertStarts[-1]), vertCapacity))
+        self.linkCount = ti.static(max(int(self.linkStarts[-1]), linkCapacity))
+        self.vertStart = ti.field(int, self.playerCount + 1) # device copy of vertStarts
+        self.linkStart = ti.field(int, self.playerCount + 1) # device copy of linkStarts
+        self.vertPlayer = ti.field(int, self.vertCount) # player of every vert
+        self.restPos = ti.Vector.field(2, float, self.vertCount) # mesh of every vert around the spawn point
+        self.restLinks = ti.Vector.field(2, int, self.linkCount) # links of a freshly spawned player
+        self.spawnPoints = np.zeros((self.playerCount, 2)) # where init placed the players
+
+        self.pos = ti.Vector.field(2, float, self.vertCount)  # position of the vertices
+        self.enabled = ti.field(int, self.vertCount) # 1 if enabled, 0 if disabled
+        self.vel = ti.Vector.field(2, float, self.vertCount)  # velocity of the vertices
+        self.f = ti.Vector.field(2, float, self.vertCount)  # forces of the vertices
+        self.prevPos = ti.Vector.field(2, float, self.vertCount)  # positions before the last advance_n
+        self.renderPos = ti.Vector.field(2, float, self.vertCount)  # positions interpolated for drawing
+        self.links = ti.Vector.field(2, int, self.linkCount)  # if first = -1, then no link
+
+        self.playerCenters = ti.Vector.field(2, float, self.playerCount) # center of all players vertices
+        self.playerVertsActive = ti.field(int, self.playerCount) # number of active verts per player
+        self.playerMin = ti.Vector.field(2, float, self.playerCount) # lower corner of the bounding box
+        self.playerMax = ti.Vector.field(2, float, self.playerCount) # upper corner of the bounding box
+        self.playerRadius = ti.field(float, self.playerCount) # max distance of a vert to the center
+        self.playerColors = ti.Vector.field(3, ti.u8, self.playerCount) # rgb color for rendering
+
+        # per player results the host needs every frame, kernels write them straight into this numpy memory
+        # ndarray arguments share the memory with numpy on the cpu, so reading them needs no to_numpy copy
+        self.hostCenters = np.zeros((self.playerCount, 2), dtype=np.float32) # playerCenters after the last advance
+        self.hostVertsActive = np.zeros(self.playerCount, dtype=np.int32) # playerVertsActive after the last advance
+        self.colorBuffer = np.zeros((self.playerCount, 3), dtype=np.uint8) # host copy for uploads
+
+        self.frame = ti.field(int, self.arenas) # current frame of every arena
+        self.arenaVertsActive = ti.field(int, self.arenas) # number of active verts per arena
+
+        self.hurdles = ti.Vector.field(3, float, (self.arenas, 50)) # hurdles to collide with
+        self.hurdleCount = ti.field(int, self.arenas)
+        self.hurdleBuffer = np.zeros((self.arenas, 50, 3), dtype=np.float32) # host copy for uploads
+
+        # compact lists of the enabled verts and links, all advance passes loop over these
+        self.activeVerts = ti.field(int, self.vertCount) # ids of enabled verts
+        self.activeVertCount = ti.field(int, 1)
+        self.activeLinks = ti.field(int, self.linkCount) # ids of enabled links
+        self.activeLinkCount = ti.field(int, 1)
+        self.activeDirty = ti.field(int, 1) # 1 if something got disabled since the last rebuild
+
+        # advance_frame runs all substeps in the single kernel advance_n or launches every substep with parallel passes
+        # the launches cost about 1.6 ms per frame, parallel passes only pay that back on big sims and several cores
+        if fused is None:
+            fused = self.vertCount <= self.fusedVerts or ti.cfg.cpu_max_num_threads == 1
+        self.fused = fused
+
+        # spatial hash grid for the collision broad phase, cell size is the collision radius
+        # set gridCollision to False to use the old check against all close players
+        self.gridCollision = ti.static(gridCollision)
+        self.gridSize = ti.static(1 << (2 * self.vertCount - 1).bit_length()) # power of 2 buckets
+        self.gridCount = ti.field(int, self.gridSize) # number of verts per bucket
+        self.gridStart = ti.field(int, self.gridSize) # first index of bucket in gridVerts
+        self.gridVerts = ti.field(int, self.vertCount) # vert ids sorted by bucket
+        self.vertCell = ti.Vector.field(3, int, self.vertCount) # grid cell and arena of every vert
+
+    # the meshes of every player and where their verts and links start
+    def layout(self, meshes):
+        if len(meshes) not in (1, self.arenaPlayers):
+            raise ValueError(f"need 1 or {self.arenaPlayers} meshes, got {len(meshes)}")
+        meshes = [meshes[(p % self.arenaPlayers) % len(meshes)] for p in range(self.playerCount)]
+        vertStarts = np.cumsum([0] + [len(points) for points, links in meshes]).astype(np.int32)
+        linkStarts = np.cumsum([0] + [len(links) for points, links in meshes]).astype(np.int32)
+        return meshes, vertStarts, linkStarts
+
+    # give the players other meshes, like the ones of the constructor, and place them with init afterwards
+    # the kernels stay compiled as long as all verts and links fit into vertCount and linkCount
+    def set_meshes(self, meshes):
+        meshes, vertStarts, linkStarts = self.layout(meshes)
+        if vertStarts[-1] > self.vertCount or linkStarts[-1] > self.linkCount:
+            raise ValueError(f"{vertStarts[-1]} verts and {linkStarts[-1]} links do not fit into "
+                             f"{self.vertCount} and {self.linkCount}, pass vertCapacity and linkCapacity")
+        self.meshes, self.vertStarts, self.linkStarts = meshes, vertStarts, linkStarts
+
+    @ti.func
+    # player link to link
+    def pl2l(self, playerId, link):
+        return self.linkStart[playerId] + link
+
+    @ti.func
+    # player vert to vert
+    def pv2v(self, playerId, vert):
+        return self.vertStart[playerId] + vert
+
+    @ti.func
+    # vert to player id
+    def v2p(self, vert):
+        return self.vertPlayer[vert]
+
+    @ti.pyfunc
+    # player id to arena
+    def p2a(self, playerId: int) -> int:
+        return playerId // self.arenaPlayers
+
+    @ti.func
+    # vert to arena
+    def v2a(self, vert):
+        return self.p2a(self.vertPlayer[vert])
+
+    @ti.func
+    # rebuild the active vert and link lists with a prefix sum if anything got disabled
+    def compact_active(self):
+        # serial so the lists stay sorted, the outer loop runs once
+        for _ in range(1):
+            if self.activeDirty[0]:
+                n = 0
+                for i in range(self.vertCount):
+                    if self.enabled[i]:
+                        self.activeVerts[n] = i
+                        n += 1
+                self.activeVertCount[0] = n
+
+                n = 0
+                for l in range(self.linkCount):
+                    if self.links[l][0] != -1:
+                        self.activeLinks[n] = l
+                        n += 1
+                self.activeLinkCount[0] = n
+
+                self.activeDirty[0] = 0
+
+    @ti.func
+    # grid cell to hash bucket, the arena is the third coordinate
+    def cell2h(self, cell):
+        return ((cell[0] * 73856093) ^ (cell[1] * 19349663) ^ (cell[2] * 83492791)) & (self.gridSize - 1)
+
+    @ti.func
+    # push two verts apart if they are too close
+    def collide(self, i, j):
+        diff = self.pos[j] - self.pos[i]
+        dist = diff.norm()
+        if dist < self.collRadius:
+            # colliding, push apart
+            f = diff.normalized() * (self.spring  * (-1 + (1.0 + self.collRadius - dist)**5))
+            self.f[i] -= f
+            self.f[j] += f
+
+    @ti.func
+    # bin all enabled verts into the hash grid with a counting sort
+    def build_grid(self):
+        for h in range(self.gridSize):
+            self.gridCount[h] = 0
+
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            cell = ti.floor(self.pos[i] / self.collRadius).cast(int)
+            self.vertCell[i] = ti.Vector([cell[0], cell[1], self.v2a(i)])
+            self.gridCount[self.cell2h(self.vertCell[i])] += 1
+
+        # exclusive prefix sum over the buckets, the outer loop makes it serial
+        for _ in range(1):
+            start = 0
+            for h in range(self.gridSize):
+                self.gridStart[h] = start
+                start += self.gridCount[h]
+                self.gridCount[h] = 0 # reused as fill counter below
+
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            h = self.cell2h(self.vertCell[i])
+            self.gridVerts[self.gridStart[h] + ti.atomic_add(self.gridCount[h], 1)] = i
+
+    @ti.func
+    # collide every vert with the verts in its 3x3 grid neighbourhood of the same arena
+    def grid_collisions(self):
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            for dx, dy in ti.static(ti.ndrange((-1, 2), (-1, 2))):
+                cell = self.vertCell[i] + ti.Vector([dx, dy, 0])
+                h = self.cell2h(cell)
+                for c in range(self.gridStart[h], self.gridStart[h] + self.gridCount[h]):
+                    j = self.gridVerts[c]
+                    # several cells can share a bucket, only take the verts of this cell
+                    other = self.vertCell[j]
+                    if i < j and other[0] == cell[0] and other[1] == cell[1] and other[2] == cell[2]:
+                        self.collide(i, j)
+
+    @ti.func
+    # apply the controller input
+    def apply_input(self, dt):
+        for p in range(self.playerCount):
+            if ti.static(self.inputBlend > 0):
+                blend = ti.min(self.inputAge[p] / self.inputBlend, 1.0)
+                self.control[p] = self.inputFrom[p] + blend * (self.input[p] - self.inputFrom[p])
+                self.inputAge[p] += dt
+            else:
+                self.control[p] = self.input[p]
+
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            # find which player and do input update
+            p = self.v2p(i)
+            self.vel[i] += dt * self.speed * self.control[p]  # apply the controller input
+
+    @ti.func
+    # calculate the mean center, bounding box and radius of every player in parallel over all verts
+    def player_stats(self, centers: ti.template(), vertsActive: ti.template()):
+        for p in range(self.playerCount):
+            self.playerCenters[p] = zero # reset position
+            self.playerVertsActive[p] = 0
+            self.playerMin[p] = ti.Vector([1e9, 1e9])
+            self.playerMax[p] = ti.Vector([-1e9, -1e9])
+            self.playerRadius[p] = 0.0
+
+        for a in range(self.arenas):
+            self.arenaVertsActive[a] = 0
+
+        # add to centers
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            p = self.v2p(i)
+            pos = self.pos[i]
+            self.playerCenters[p] += pos
+            self.playerVertsActive[p] += 1
+            self.arenaVertsActive[self.p2a(p)] += 1
+            ti.atomic_min(self.playerMin[p][0], pos[0])
+            ti.atomic_min(self.playerMin[p][1], pos[1])
+            ti.atomic_max(self.playerMax[p][0], pos[0])
+            ti.atomic_max(self.playerMax[p][1], pos[1])
+
+        for p in range(self.playerCount):
+            # dead players keep the center at zero instead of dividing by zero
+            if self.playerVertsActive[p] > 0:
+                self.playerCenters[p] /= self.playerVertsActive[p]
+            else:
+                self.playerMin[p] = zero
+                self.playerMax[p] = zero
+            # the host reads these, written right into its arrays instead of copied out afterwards
+            centers[p, 0] = self.playerCenters[p][0]
+            centers[p, 1] = self.playerCenters[p][1]
+            vertsActive[p] = self.playerVertsActive[p]
+
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            p = self.v2p(i)
+            ti.atomic_max(self.playerRadius[p], (self.pos[i] - self.playerCenters[p]).norm())
+
+    @ti.func
+    # internal forces, one thread per link applies the spring force to both ends
+    def spring_forces(self):
+        for k in range(self.activeLinkCount[0]):
+            link = self.links[self.activeLinks[k]]
+            diff = self.pos[link[1]] - self.pos[link[0]]
+            dist = diff.norm()
+            f = diff.normalized() * (self.spring * (self.radius - dist))
+            self.f[link[0]] -= f
+            self.f[link[1]] += f
+
+    @ti.func
+    # forces that act on single verts
+    def vert_forces(self):
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            # find player number
+            p = self.v2p(i)
+            a = self.p2a(p)
+
+            # intercolliding forces
+            # loop through all other players of the arena and if the player is close enough, do collision
+            if ti.static(not self.gridCollision):
+                for pOther in range(a * self.arenaPlayers, (a+1) * self.arenaPlayers):
+                    # the stats are from the last frame, leave some room for movement since then
+                    reach = self.playerRadius[p] + self.playerRadius[pOther] + self.collRadius + self.radius
+                    if (self.playerCenters[p] - self.playerCenters[pOther]).norm() < reach:
+                        for j in range(self.pv2v(pOther,0), self.pv2v(pOther+1,0)):
+                            if self.enabled[j] and j!=i and i<j:
+                                self.collide(i, j)
+
+            # collision with hurdles
+            for h in range(self.hurdleCount[a]):
+                hurdle = self.hurdles[a, h]
+                hpos = ti.Vector([hurdle[0], hurdle[1]])
+
+                diff = hpos - self.pos[i]
+                dist = diff.norm()
+
+                inter = hurdle[2] - dist
+
+                if inter > 0:
+                    self.f[i] -= diff.normalized() * (self.spring * 3 * (0.5 + inter))
+
+    @ti.func
+    # simplectiv Euler
+    def integrate(self, dt):
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            # print("Force",i,self.f[i], sep=",", end="\n")
+            # damping
+            self.f[i] -= self.damping * self.vel[i]
+            self.vel[i] += self.f[i] * dt
+            self.pos[i] += dt * self.vel[i]
+
+    @ti.func
+    def clear_forces(self):
+        for k in range(self.activeVertCount[0]):
+            self.f[self.activeVerts[k]] = zero
+
+    @ti.func
+    # keep the last state to interpolate between for rendering
+    def keep_positions(self):
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            self.prevPos[i] = self.pos[i]
+
+    @ti.func
+    # one simulation step, every loop is a separate pass over all verts or links
+    def substep(self, dt):
+        self.apply_input(dt)
+        self.clear_forces()
+        self.spring_forces()
+        self.vert_forces()
+
+        # intercolliding forces through the hash grid, only neighbouring cells can collide
+        if ti.static(self.gridCollision):
+            self.build_grid()
+            self.grid_collisions()
+
+        self.integrate(dt)
+
+    @ti.func
+    # arenas without any verts left are over and keep their frame count
+    def count_frame(self):
+        for a in range(self.arenas):
+            if self.arenaVertsActive[a] > 0:
+                self.frame[a] += 1
+
+    @ti.kernel
+    def advance(self, dt: float, centers: ti.types.ndarray(), vertsActive: ti.types.ndarray()):
+        self.compact_active()
+        self.substep(dt)
+        self.player_stats(centers, vertsActive)
+        self.count_frame()
+
+    @ti.kernel
+    # advance a whole frame of substeps in a single kernel launch
+    # cheapest for small sims, where launching the passes costs more than running them
+    def advance_n(self, dt: float, steps: int, centers: ti.types.ndarray(), vertsActive: ti.types.ndarray()):
+        self.compact_active()
+        self.keep_positions()
+
+        # substeps depend on each other so the outer loop has to be serial,
+        # taichi only parallelizes outermost loops, so all passes run on one thread
+        for _ in range(1):
+            for s in range(steps):
+                self.substep(dt)
+
+        # the player stats are only needed once per frame
+        self.player_stats(centers, vertsActive)
+        self.count_frame() # counts frames, not substeps
+
+    # the same frame as advance_n with one launch per substep, begin_frame, steps times advance_substep, end_frame
+    # the passes are the outermost loops there and run in parallel, atomics may sum up in another order than in advance_n
+    @ti.kernel
+    def begin_frame(self):
+        self.compact_active()
+        self.keep_positions()
+
+    @ti.kernel
+    def advance_substep(self, dt: float):
+        self.substep(dt)
+
+    @ti.kernel
+    def end_frame(self, centers: ti.types.ndarray(), vertsActive: ti.types.ndarray()):
+        self.player_stats(centers, vertsActive)
+        self.count_frame()
+
+    # a whole frame of substeps, in one serial kernel for small sims and with parallel passes for big ones
+    def advance_frame(self, dt, steps):
+        if self.fused:
+            self.advance_n(dt, steps, self.hostCenters, self.hostVertsActive)
+            return
+        self.begin_frame()
+        for _ in range(steps):
+            self.advance_substep(dt)
+        self.end_frame(self.hostCenters, self.hostVertsActive)
+
+    # the passes of a substep as kernels of their own, so each one can be timed
+    # inside advance_n they are all one serial task
+    @ti.kernel
+    def pass_input(self, dt: float):
+        self.apply_input(dt)
+
+    @ti.kernel
+    # clearing the forces is too short to be worth a launch of its own
+    def pass_springs(self):
+        self.clear_forces()
+        self.spring_forces()
+
+    @ti.kernel
+    def pass_verts(self):
+        self.vert_forces()
+
+    @ti.kernel
+    def pass_grid(self):
+        self.build_grid()
+
+    @ti.kernel
+    def pass_collisions(self):
+        self.grid_collisions()
+
+    @ti.kernel
+    def pass_integrate(self, dt: float):
+        self.integrate(dt)
+
+    @ti.kernel
+    # does nothing, advance_passes takes the time of its launch off every pass
+    def idle(self):
+        pass
+
+    # does what advance_frame does, but launches every pass on its own and times it
+    # returns name -> [(start, seconds)] with one entry per launch, start in perf_counter seconds
+    # the seconds are the wall time of launch and sync minus that of an idle launch, which still leaves some launch cost
+    # the launches make it slower, only use it while the passes are profiled
+    # the kernels compile on the first call unless warm_up got passes, it returns no times because they would only show the compiling
+    def advance_passes(self, dt, steps):
+        launches = [('compact', self.begin_frame, ())]
+        for _ in range(steps):
+            launches.append(('input', self.pass_input, (dt,)))
+            launches.append(('springs', self.pass_springs, ()))
+            launches.append(('verts', self.pass_verts, ()))
+            if self.gridCollision:
+                launches.append(('grid', self.pass_grid, ()))
+                launches.append(('collide', self.pass_collisions, ()))
+            launches.append(('integrate', self.pass_integrate, (dt,)))
+        launches.append(('stats', self.end_frame, (self.hostCenters, self.hostVertsActive)))
+
+        starts = []
+        for name, kernel, args in launches:
+            starts.append(time.perf_counter())
+            kernel(*args)
+            ti.sync()
+        starts.append(time.perf_counter())
+
+        if not self.passesCompiled:
+            self.passesCompiled = True
+            self.launchCost = self.idle_launch_cost()
+            return {}
+
+        durations = np.maximum(np.diff(starts) - self.launchCost, 0.0)
+        times = {}
+        for (name, kernel, args), start, duration in zip(launches, starts, durations):
+            times.setdefault(name, []).append((start, duration))
+        return times
+
+    # median seconds of launching and syncing the idle kernel
+    def idle_launch_cost(self, repeats=200):
+        self.idle()
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            self.idle()
+            ti.sync()
+            times.append(time.perf_counter() - start)
+        return float(np.median(times))
+
+    @ti.kernel
+    # blend between the states before and after the last advance_n, alpha 1 is the newest state
+    def interpolate(self, alpha: float):
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            self.renderPos[i] = self.prevPos[i] + alpha * (self.pos[i] - self.prevPos[i])
+
+    @ti.kernel
+    # write a triangle for every enabled vert and a line for every enabled link into preallocated arrays
+    # everything is in screen coordinates, counts gets the number of dots and lines
+    def render_buffers(self, offsetX: float, offsetY: float, scale: float, shape: ti.types.ndarray(),
+                       dots: ti.types.ndarray(), dotColors: ti.types.ndarray(),
+                       lines: ti.types.ndarray(), counts: ti.types.ndarray()):
+        self.compact_active()
+        offset = ti.Vector([offsetX, offsetY])
+
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            color = self.playerColors[self.v2p(i)]
+            screen = (self.renderPos[i] - offset) * scale
+            for c in ti.static(range(3)):
+                dots[k*3 + c, 0] = screen[0] + shape[c, 0]
+                dots[k*3 + c, 1] = screen[1] + shape[c, 1]
+                for rgb in ti.static(range(3)):
+                    dotColors[k*3 + c, rgb] = color[rgb]
+
+        for k in range(self.activeLinkCount[0]):
+            link = self.links[self.activeLinks[k]]
+            for end in ti.static(range(2)):
+                screen = (self.renderPos[link[end]] - offset) * scale
+                lines[k*2 + end, 0] = screen[0]
+                lines[k*2 + end, 1] = screen[1]
+
+        counts[0] = self.activeVertCount[0]
+        counts[1] = self.activeLinkCount[0]
+
+    @ti.kernel
+    # recompute the player stats without stepping, e.g. after init
+    def update_players(self, centers: ti.types.ndarray(), vertsActive: ti.types.ndarray()):
+        self.compact_active()
+        self.player_stats(centers, vertsActive)
+
+    @ti.kernel
+    # arena -1 destroys in all arenas
+    def destruction(self, x:float, y:float, r:float, reversed:int, arena:int):
+        deathCenter = ti.Vector([x,y])
+        self.compact_active()
+
+        # loop through all points and disable those in range
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            if(self.enabled[i] and (arena == -1 or self.v2a(i) == arena)):
+                # check if in death distance
+                diff = self.pos[i] - deathCenter
+                dist = diff.norm()
+                if reversed:
+                    if (dist > r + self.collRadius):
+                        self.enabled[i] = False
+                        self.activeDirty[0] = 1
+                else:
+                    if (dist < r + self.collRadius):
+                        self.enabled[i] = False
+                        self.activeDirty[0] = 1
+
+        # disable all links with a disabled points
+        for k in range(self.activeLinkCount[0]):
+            l = self.activeLinks[k]
+            if(self.links[l][0] != -1):
+                a = self.links[l][0]
+                b = self.links[l][1]
+                if not self.enabled[a] or not self.enabled[b]:
+                    self.links[l] = ti.Vector([-1,-1])
+
+    # disable all player verts and links
+    @ti.kernel
+    def killPlayer(self, p:int):
+        self.activeDirty[0] = 1
+
+        for i in range(self.pv2v(p,0), self.pv2v(p+1,0)):
+            self.enabled[i] = False
+        
+        for l in range(self.pl2l(p,0), self.pl2l(p+1,0)):
+            self.links[l] = ti.Vector([-1,-1])
+
+    # put the whole mesh of player p back, placed at x, y like init does, eg. for a new player on the slot
+    @ti.kernel
+    def spawn(self, p:int, x:float, y:float):
+        self.activeDirty[0] = 1
+        offset = ti.Vector([x,y])
+
+        for i in range(self.pv2v(p,0), self.pv2v(p+1,0)):
+            self.enabled[i] = True
+            self.pos[i] = self.restPos[i] + offset
+            self.prevPos[i] = self.pos[i]
+            self.renderPos[i] = self.pos[i]
+            self.vel[i] = zero
+
+        for l in range(self.pl2l(p,0), self.pl2l(p+1,0)):
+            self.links[l] = self.restLinks[l]
+
+    # destroy all points that are outside play area
+    @ti.kernel
+    def killBorders(self, offsetX: float, offsetY: float, size: float, arena: int):
+        minim = ti.Vector([offsetX,offsetY])
+        maxim = ti.Vector([offsetX + size,offsetY + size])
+        self.compact_active()
+
+        # loop through all points and disable those outside the area
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            if(self.enabled[i] and (arena == -1 or self.v2a(i) == arena)):
+                # check if outside the area
+                pos = self.pos[i]
+                if (pos[0] < minim[0] or pos[0] > maxim[0]
+                    or pos[1] < minim[1] or pos[1] > maxim[1] ):
+                    self.enabled[i] = False
+                    self.activeDirty[0] = 1
+
+        # disable all links with a disabled points
+        for k in range(self.activeLinkCount[0]):
+            l = self.activeLinks[k]
+            if(self.links[l][0] != -1):
+                a = self.links[l][0]
+                b = self.links[l][1]
+                if not self.enabled[a] or not self.enabled[b]:
+                    self.links[l] = ti.Vector([-1,-1])
+
+    @ti.kernel
+    def bombExplosion(self, x:float, y:float, arena:int):
+        bombPos = ti.Vector([x,y])
+        self.compact_active()
+
+        # go through all verts and apply velocity proportional to distance
+        for k in range(self.activeVertCount[0]):
+            i = self.activeVerts[k]
+            if arena == -1 or self.v2a(i) == arena:
+                diff = bombPos - self.pos[i]
+                dist = diff.norm()
+                self.vel[i] -= diff.normalized() * 20 *  max(0, 15-dist)
+
+    # compile the kernels a match uses before it starts, call it right after init
+    # the calls change nothing there: a step of 0 seconds, player 0 respawned where init put it, the frame counts restored
+    # advance, the passes of advance_frame that are not picked and, without passes, advance_passes compile on their first call
+    # taichi keeps the compiled kernels in its offline cache on disk, the next start only loads them
+    def warm_up(self, passes=False):
+        nowhere = self.arenas # no vert is in this arena
+        frames = self.frame.to_numpy()
+        self.advance_frame(0.0, 1)
+        if passes: # the kernels of advance_passes too, when the passes get profiled from the start
+            self.advance_passes(0.0, 1)
+        self.frame.from_numpy(frames)
+        self.interpolate(1.0)
+        self.update_players(self.hostCenters, self.hostVertsActive)
+        self.destruction(0.0, 0.0, 0.0, 0, nowhere)
+        self.killBorders(0.0, 0.0, 0.0, nowhere)
+        self.bombExplosion(0.0, 0.0, nowhere)
+        self.killPlayer(0)
+        self.spawn(0, *self.spawnPoints[0])
+        self.push_input(self.lastInput)
+        self.upload_hurdles(0, self.hurdleBuffer[0], self.hurdleCount[0])
+        # same array types as the vertex list views of the renderer
+        self.render_buffers(0.0, 0.0, 1.0, np.zeros((3, 2), dtype=np.float32),
+            np.zeros((self.vertCount * 3, 2), dtype=np.float32), np.zeros((self.vertCount * 3, 3), dtype=np.uint8),
+            np.zeros((self.linkCount * 2, 2), dtype=np.float32), np.zeros(2, dtype=np.int32))
+
+    # not a kernel because of numpy
+    # builds the state of all players at once and uploads it with one from_numpy per field
+    def init_with_numpy(self, mapSize, offsetX, offsetY):
+        rows = 3
+        # while not all players fit inside a grid without outermost nodes
+        while (rows - 2)**2 < self.arenaPlayers:
+            rows += 1
+
+        rowSpace = mapSize / rows
+
+        # every arena gets the same layout
+        slot = np.arange(self.playerCount) % self.arenaPlayers
+        px = slot % (rows-2)
+        py = slot // (rows-2)
+        offsets = np.stack([offsetX + 1.5*rowSpace + px * rowSpace,
+                            offsetY + 1.5*rowSpace + py * rowSpace], axis=1)
+        self.spawnPoints = offsets
+
+        # move the mesh of every player to its offset and its links to its verts
+        vertsPerPlayer = np.diff(self.vertStarts)
+        linksPerPlayer = np.diff(self.linkStarts)
+        points = np.concatenate([points for points, links in self.meshes])
+        links = np.concatenate([links for points, links in self.meshes])
+        # rounded like spawn, which adds the float32 offset to the float32 rest positions
+        pos = points.astype(np.float32) + np.repeat(offsets, vertsPerPlayer, axis=0).astype(np.float32)
+        links = (links + np.repeat(self.vertStarts[:-1], linksPerPlayer)[:, np.newaxis]).astype(np.int32)
+
+        # the unused capacity behind the meshes, disabled verts and removed links
+        freeVerts = self.vertCount - len(points)
+        freeLinks = self.linkCount - len(links)
+        pos = np.concatenate([pos, np.zeros((freeVerts, 2), dtype=np.float32)])
+        points = np.concatenate([points, np.zeros((freeVerts, 2))])
+        links = np.concatenate([links, np.full((freeLinks, 2), -1, dtype=np.int32)])
+
+        self.vertStart.from_numpy(self.vertStarts)
+        self.linkStart.from_numpy(self.linkStarts)
+        self.vertPlayer.from_numpy(np.concatenate([np.repeat(np.arange(self.playerCount, dtype=np.int32), vertsPerPlayer),
+                                                   np.zeros(freeVerts, dtype=np.int32)]))
+        self.enabled.from_numpy((np.arange(self.vertCount) < self.vertStarts[-1]).astype(np.int32))
+        self.pos.from_numpy(pos)
+        self.prevPos.from_numpy(pos)
+        self.renderPos.from_numpy(pos)
+        self.vel.from_numpy(np.zeros_like(pos)) # set_meshes reuses the fields of the last match
+        self.links.from_numpy(links)
+        self.restPos.from_numpy(points.astype(np.float32))
+        self.restLinks.from_numpy(links)
+        self.activeDirty[0] = 1
+
+    # place the meshes of all players on the map
+    def init(self, mapSize, offsetX, offsetY):
+        self.init_with_numpy(mapSize, offsetX, offsetY)
+        self.update_players(self.hostCenters, self.hostVertsActive)
+
+    @ti.kernel
+    # players whose input changed start blending from their current control to the new input
+    def push_input(self, externalInput: ti.types.ndarray()):
+        for p in range(self.playerCount):
+            newInput = ti.Vector([externalInput[p, 0], externalInput[p, 1]])
+            if (newInput != self.input[p]).any():
+                self.inputFrom[p] = self.control[p]
+                self.input[p] = newInput
+                self.inputAge[p] = 0.0
+
+    def set_input(self, externalInput):
+        # the phones send far less often than frames are drawn, most frames have nothing to upload
+        if np.array_equal(externalInput, self.lastInput):
+            return
+        self.lastInput[...] = externalInput
+        self.push_input(self.lastInput)
+
+    # set the rgb colors of the players starting at firstPlayer
+    def set_colors(self, firstPlayer, colors):
+        self.colorBuffer[firstPlayer:firstPlayer + len(colors)] = colors
+        self.playerColors.from_numpy(self.colorBuffer)
+
+    @ti.kernel
+    # only the rows of one arena are written, the other arenas keep theirs
+    def upload_hurdles(self, arena: int, hurdles: ti.types.ndarray(), count: int):
+        for h in range(count):
+            self.hurdles[arena, h] = ti.Vector([hurdles[h, 0], hurdles[h, 1], hurdles[h, 2]])
+        self.hurdleCount[arena] = count
+
+    # replace the hurdles [[x, y, r]] of one arena
+    def set_hurdles(self, arena, hurdles):
+        count = min(len(hurdles), self.hurdleBuffer.shape[1])
+        self.hurdleBuffer[arena, :count] = hurdles[:count]
+        self.upload_hurdles(arena, self.hurdleBuffer[arena], count)
+
+    def roundMesh(self):
+        points = np.array([
+            [1,0],
+            [2,0],
+            [0,1],
+            [1.5,1],
+            [2.5,1],
+            [1,2],
+            [2,2]
+        ], dtype=np.float32)
+
+        links = np.array([
+            [0,1], # 0
+            [0,2],
+            [0,3],
+            [1,3], # 3
+            [1,4],
+            [2,3],
+            [3,4], # 6
+            [2,5],
+            [3,5],
+            [3,6], # 9
+            [4,6],
+            [5,6],
+        ], dtype=int)
+
+        return points, links
+
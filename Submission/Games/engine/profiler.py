@@ -0,0 +1,171 @@
+import time
+import argparse
+import contextlib
+import collections
+import numpy as np
+import ujson as json
+
+# a phase that records nothing, what a disabled profiler hands out
+nullPhase = contextlib.nullcontext()
+
+# times one named phase, reused for every frame so recording allocates nothing
+class Phase:
+    __slots__ = ('profiler', 'name', 'start', 'open', 'skip')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+        self.open = False
+        self.skip = False # record nothing when it ends this time
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.open = True
+
+    def __exit__(self, *exc):
+        self.open = False
+        if self.skip:
+            self.skip = False
+            return
+        self.profiler.record(self.name, self.start, time.perf_counter() - self.start)
+
+# records how long the named phases of the frames take, eg. with profiler.phase('SIM'): ...
+# every phase keeps its last capacity times in a ring buffer, older ones get overwritten
+# summary gives percentiles on demand, save_trace writes the kept phases for chrome://tracing or ui.perfetto.dev
+# with passes the engine also times every pass of the sim kernels, the launches make the frames slower while it is on
+class Profiler:
+    def __init__(self, enabled=True, capacity=2048, tracePath=None, passes=False):
+        self.enabled = enabled
+        self.passes = passes
+        self.capacity = capacity
+        self.tracePath = tracePath # written by finish
+        self.phases = {}
+        self.starts = {} # seconds since perf_counter 0, per phase
+        self.durations = {} # seconds, per phase
+        self.counts = {} # phases recorded so far, the ring position is count % capacity
+        self.launched = set() # phases recorded by add, the trace shows their launches instead
+        self.launches = collections.deque(maxlen=capacity * 64) # (name, start, seconds) of every launch, for the trace
+
+    def phase(self, name):
+        if not self.enabled:
+            return nullPhase
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = Phase(self, name)
+            self.starts[name] = np.zeros(self.capacity)
+            self.durations[name] = np.zeros(self.capacity)
+            self.counts[name] = 0
+        return phase
+
+    # the phases running right now record nothing this time, eg. because they compile kernels
+    def skip_open(self):
+        for phase in self.phases.values():
+            if phase.open:
+                phase.skip = True
+
+    # records phases that ran as several launches, name -> [(start, seconds)] like advance_passes returns them
+    # the summary gets their sum, the trace every launch on a row of its own
+    def add(self, launches):
+        for name, runs in launches.items():
+            self.phase(name)
+            self.record(name, runs[0][0], sum(duration for start, duration in runs))
+            self.launched.add(name)
+            self.launches.extend((name, start, duration) for start, duration in runs)
+
+    def record(self, name, start, duration):
+        i = self.counts[name] % self.capacity
+        self.starts[name][i] = start
+        self.durations[name][i] = duration
+        self.counts[name] += 1
+
+    # the kept durations of one phase in seconds, oldest first
+    def times(self, name):
+        count = self.counts[name]
+        if count <= self.capacity:
+            return self.durations[name][:count]
+        return np.roll(self.durations[name], -(count % self.capacity))
+
+    # milliseconds per phase over the kept frames
+    def summary(self):
+        result = {}
+        for name in self.phases:
+            times = self.times(name) * 1000
+            if len(times) == 0:
+                continue
+            p50, p90, p99 = np.percentile(times, [50, 90, 99])
+            result[name] = {"count": self.counts[name], "mean": times.mean(), "p50": p50, "p90": p90, "p99": p99, "max": times.max()}
+        return result
+
+    def format_summary(self):
+        lines = [f"{'phase':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:>9} {s['p50']:>8.3f} {s['p90']:>8.3f} {s['p99']:>8.3f} {s['max']:>8.3f}")
+        return "\n".join(lines)
+
+    # chrome trace event format, one complete event per kept phase, the launches of added phases on tid 1
+    def save_trace(self, path):
+        events = []
+        for name in self.phases:
+            if name in self.launched:
+                continue
+            kept = min(self.counts[name], self.capacity)
+            for start, duration in zip(self.starts[name][:kept], self.durations[name][:kept]):
+                events.append({"name": name, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": 0, "tid": 0})
+        for name, start, duration in self.launches:
+            events.append({"name": name, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": 0, "tid": 1})
+        events.sort(key=lambda event: event["ts"])
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    # the game is over, print the summary and write the trace if asked for
+    def finish(self):
+        if not self.enabled:
+            return
+        print(self.format_summary())
+        if self.tracePath is not None:
+            self.save_trace(self.tracePath)
+            print(f"Trace of the last {self.capacity} frames written to {self.tracePath}")
+
+# the summary in the top left corner of the window, F3 shows and hides it
+# F4 starts and stops timing the passes of the sim, it turns the profiler on if it was off
+class ProfilerHud:
+    def __init__(self, profiler, window, visible=True, every=30):
+        import pyglet # only needed with a window
+
+        self.profiler = profiler
+        self.window = window
+        self.visible = visible
+        self.every = every # frames between text updates, a new layout per frame would cost more than the phases
+        self.frames = 0
+        self.label = pyglet.text.Label("", font_name='Courier New', font_size=11, color=(0, 0, 0, 255),
+                                       x=10, y=window.height - 10, width=window.width, multiline=True,
+                                       anchor_x='left', anchor_y='top')
+        self.key = pyglet.window.key.F3
+        self.passesKey = pyglet.window.key.F4
+        window.push_handlers(on_key_press=self.on_key_press)
+
+    def on_key_press(self, symbol, modifiers):
+        if symbol == self.key:
+            self.visible = not self.visible
+        elif symbol == self.passesKey:
+            self.profiler.passes = not self.profiler.passes
+            self.profiler.enabled = True
+
+    def draw(self):
+        if not self.profiler.enabled or not self.visible:
+            return
+        if self.frames % self.every == 0:
+            self.label.text = self.profiler.format_summary()
+        self.frames += 1
+        self.label.draw()
+
+# --profile records the phases and prints the summary at the end, --trace also writes the chrome trace
+# --passes also times the passes of the sim from the start
+def from_args(argv):
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile', action='store_true', help="time the phases of every frame, F3 shows them")
+    parser.add_argument('--trace', metavar='FILE', help="write the timed phases as chrome trace json at the end")
+    parser.add_argument('--passes', action='store_true', help="time every pass of the sim kernels, F4 toggles it")
+    args, unknown = parser.parse_known_args(argv)
+    return Profiler(enabled=args.profile or args.passes or args.trace is not None, tracePath=args.trace, passes=args.passes)
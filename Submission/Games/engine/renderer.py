@@ -0,0 +1,50 @@
+import types
+import numpy as np
+import pyglet
+
+# draws the dots and springs of a MultiPlayer
+# the vertex lists are allocated once for all verts and links, every frame the sim writes straight
+# into their client side memory and only the used range gets uploaded and drawn
+# needs a GL context, so create it after the window
+class Renderer:
+    def __init__(self, multiPlayer, triangle, lineColor=(20,20,20)):
+        self.multiPlayer = multiPlayer
+        self.triangle = np.asarray(triangle, dtype=np.float32)
+
+        dotCapacity = multiPlayer.vertCount * 3
+        lineCapacity = multiPlayer.linkCount * 2
+        self.dotList = pyglet.graphics.vertex_list(dotCapacity, 'v2f/stream', 'c3B/stream')
+        self.lineList = pyglet.graphics.vertex_list(lineCapacity, 'v2f/stream',
+                                                    ('c3B/static', tuple(lineColor) * lineCapacity))
+
+        # allocating can move the buffers, so only take the views once all lists exist
+        self.dots = self.view(self.dotList, 'vertices', 2)
+        self.dotColors = self.view(self.dotList, 'colors', 3)
+        self.lines = self.view(self.lineList, 'vertices', 2)
+        self.counts = np.zeros(2, dtype=np.int32) # dots, lines
+
+    # region of the first count vertices of one attribute
+    @staticmethod
+    def region(vertexList, name, count):
+        attribute = vertexList.domain.attribute_names[name]
+        return attribute.get_region(attribute.buffer, vertexList.start, count)
+
+    # numpy array sharing memory with one attribute of a vertex list
+    def view(self, vertexList, name, components):
+        array = self.region(vertexList, name, vertexList.count).array
+        return np.ctypeslib.as_array(array).reshape(-1, components)
+
+    # upload the first count vertices and draw only them
+    def draw_range(self, vertexList, mode, count, changed):
+        for name in changed:
+            self.region(vertexList, name, count).invalidate()
+        vertexList.domain.draw(mode, types.SimpleNamespace(start=vertexList.start, count=count))
+
+    def draw(self, offsetX, offsetY, scale):
+        self.multiPlayer.render_buffers(offsetX, offsetY, scale, self.triangle,
+                                        self.dots, self.dotColors, self.lines, self.counts)
+        count, linkCount = self.counts
+
+        # springs first so the dots are drawn on top
+        self.draw_range(self.lineList, pyglet.gl.GL_LINES, linkCount * 2, ['vertices'])
+        self.draw_range(self.dotList, pyglet.gl.GL_TRIANGLES, count * 3, ['vertices', 'colors'])
@@ -2,9 +2,14 @@ package main
 
 import (
 	//"crypto/rand"
+	"encoding/binary"
 	"fmt"
+	"math"
 	randMath "math/rand"
+	"net"
 	"net/http"
+	"os"
+	"sync"
 	"time"
 
 	"github.com/gin-gonic/gin"
@@ -68,6 +73,35 @@ var playersData = [len(usedColor)]players {
 var playersSecretData = [len(usedColor)]playersSecret {
 }
 
+// binary push of all inputs to the game over udp, enabled by setting PUSH_ADDR, eg. PUSH_ADDR=localhost:9999
+// one 12 byte little endian record per player: uint16 id, int8 x, int8 y, float64 unix time of the last input
+// x and y are the input scaled by 127, y is sent as the client sent it
+const pushRecordSize = 12
+
+var pushConn net.Conn = nil
+var pushLock sync.Mutex
+var pushInput [len(usedColor)][2]int8
+var pushTime [len(usedColor)]float64
+
+func pushInputs() {
+    if pushConn == nil {
+        return
+    }
+    buf := make([]byte, len(playersData) * pushRecordSize)
+    for i := range playersData {
+        record := buf[i * pushRecordSize:]
+        binary.LittleEndian.PutUint16(record[0:], uint16(i))
+        record[2] = byte(pushInput[i][0])
+        record[3] = byte(pushInput[i][1])
+        binary.LittleEndian.PutUint64(record[4:], math.Float64bits(pushTime[i]))
+    }
+    pushConn.Write(buf) // best effort, the next input sends everything again
+}
+
+func toPush(v float64) int8 {
+    return int8(math.Round(math.Min(math.Max(v, -1), 1) * 127))
+}
+
 func getInput(c *gin.Context) {
     var params = c.Request.URL.Query()
     //fmt.Println(params);
@@ -91,6 +125,15 @@ func getInput(c *gin.Context) {
             // password correct, assing input
             playersData[matching].Input = input[0];
             playersData[matching].LastInput = time.Now().Unix();
+
+            var x, y float64
+            if _, err := fmt.Sscanf(input[0], "%g,%g", &x, &y); err == nil {
+                pushLock.Lock()
+                pushInput[matching] = [2]int8{toPush(x), toPush(y)}
+                pushTime[matching] = float64(time.Now().UnixNano()) / 1e9
+                pushInputs()
+                pushLock.Unlock()
+            }
             c.String(http.StatusAccepted, "Input updated")
         }
     } else {
@@ -157,6 +200,16 @@ func main() {
 
     fmt.Println(playersData)
     fmt.Println(playersSecretData)
+
+    if addr := os.Getenv("PUSH_ADDR"); addr != "" {
+        conn, err := net.Dial("udp", addr)
+        if err != nil {
+            fmt.Println("Push disabled:", err)
+        } else {
+            pushConn = conn
+            fmt.Println("Pushing inputs to", addr)
+        }
+    }
     
     gin.SetMode(gin.ReleaseMode)
     router := gin.Default()
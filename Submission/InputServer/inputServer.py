@@ -0,0 +1,157 @@
+# stand-in for the go input server in app/main.go, to play and load test without the internet
+# same endpoints and json: /input, /assign, /client, /secret, plain asyncio without dependencies
+# python inputServer.py --port 8080 --players 20, the games then need --url http://localhost:8080/input
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import string
+import struct
+import time
+import urllib.parse
+
+# same palette as main.go
+colors20 = ["#0000cd", "#008000", "#00ff00", "#00ffff", "#191970", "#1e90ff", "#7f0000", "#808080", "#87cefa", "#90ee90", "#ba55d3", "#bdb76b", "#dda0dd", "#fa8072", "#ff00ff", "#ff1493", "#ff4500", "#ffa500", "#ffe4e1", "#ffff54"]
+
+clientFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'client.html')
+
+reasons = {200: "OK", 202: "Accepted", 403: "Forbidden", 404: "Not Found", 308: "Permanent Redirect", 418: "I'm a teapot", 507: "Insufficient Storage"}
+
+def random_password():
+    return ''.join(random.choice(string.ascii_letters) for i in range(32))
+
+class InputServer:
+    def __init__(self, players=20, push=None):
+        self.players = [{"id": i, "color": colors20[i % len(colors20)], "input": "", "lastInput": 0} for i in range(players)]
+        self.passwords = [random_password() for i in range(players)]
+        self.byPassword = {pw: i for i, pw in enumerate(self.passwords)}
+        self.requests = 0
+
+        # binary push like PUSH_ADDR in main.go, one record per player: uint16 id, int8 x, int8 y, float64 time
+        self.push = None
+        if push is not None:
+            host, port = push.rsplit(':', 1)
+            self.push = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.push.connect((host, int(port)))
+            self.push.setblocking(False)
+            self.pushRecords = bytearray(players * 12)
+            for i in range(players):
+                struct.pack_into('<Hbbd', self.pushRecords, i * 12, i, 0, 0, 0.0)
+
+    def push_input(self, p, x, y):
+        to8 = lambda v: round(min(max(v, -1), 1) * 127)
+        struct.pack_into('<Hbbd', self.pushRecords, p * 12, p, to8(x), to8(y), time.time())
+        try:
+            self.push.send(self.pushRecords) # best effort, the next input sends everything again
+        except OSError:
+            pass
+
+    def input(self, query):
+        if "pw" in query and "input" in query:
+            p = self.byPassword.get(query["pw"][0])
+            if p is None:
+                return 403, "text/plain", b"Wrong Password!"
+            self.players[p]["input"] = query["input"][0]
+            self.players[p]["lastInput"] = int(time.time())
+            if self.push is not None:
+                try:
+                    x, y = (float(v) for v in query["input"][0].split(','))
+                    self.push_input(p, x, y)
+                except ValueError:
+                    pass
+            return 202, "text/plain", b"Input updated"
+        return 200, "application/json", json.dumps(self.players).encode()
+
+    def assign(self, query):
+        current = int(time.time())
+        for p, player in enumerate(self.players):
+            if player["lastInput"] < current - 10: # delay for disconnecting
+                del self.byPassword[self.passwords[p]]
+                self.passwords[p] = random_password()
+                self.byPassword[self.passwords[p]] = p
+                player["lastInput"] = current
+                player["input"] = ""
+                return 200, "application/json", json.dumps({"id": p, "password": self.passwords[p], "color": player["color"]}).encode()
+        return 507, "text/plain", b"No free Player available :("
+
+    def secret(self, query):
+        if query.get("pw", [""])[0] == "secret":
+            return 200, "application/json", json.dumps([{"id": p, "password": pw} for p, pw in enumerate(self.passwords)]).encode()
+        return 403, "text/plain", b"Wrong Password"
+
+    def client(self, query):
+        with open(clientFile, 'rb') as f:
+            return 200, "text/html; charset=utf-8", f.read()
+
+    def route(self, target):
+        url = urllib.parse.urlsplit(target)
+        query = urllib.parse.parse_qs(url.query)
+        routes = {
+            "/input": self.input,
+            "/assign": self.assign,
+            "/secret": self.secret,
+            "/client": self.client,
+            "/tea": lambda query: (418, "text/plain", b"Cannot brew coffee, I am only a teapot"),
+            "/": lambda query: (308, "text/plain", b""),
+        }
+        if url.path not in routes:
+            return 404, "text/plain", b"404 page not found"
+        return routes[url.path](query)
+
+    # one connection, requests are answered in order as long as the client keeps it alive
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, version = line.decode('latin-1').split()
+
+                keepAlive = version == "HTTP/1.1"
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    if name.strip().lower() == "connection":
+                        keepAlive = value.strip().lower() != "close" if version == "HTTP/1.1" else value.strip().lower() == "keep-alive"
+
+                self.requests += 1
+                status, contentType, body = self.route(target)
+                head = f"HTTP/1.1 {status} {reasons[status]}\r\nContent-Type: {contentType}\r\nContent-Length: {len(body)}\r\n"
+                if status == 308:
+                    head += "Location: /tea\r\n"
+                if not keepAlive:
+                    head += "Connection: close\r\n"
+                writer.write(head.encode() + b"\r\n" + body)
+                await writer.drain()
+                if not keepAlive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+async def main(args):
+    inputServer = InputServer(args.players, args.push)
+    server = await asyncio.start_server(inputServer.handle, args.host, args.port, backlog=1024)
+    print(f"Serving {args.players} players on http://{args.host}:{args.port}/client")
+    async with server:
+        while True:
+            requests = inputServer.requests
+            await asyncio.sleep(5)
+            print(f"{(inputServer.requests - requests) / 5:.0f} requests/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--players', type=int, default=20)
+    parser.add_argument('--push', metavar='HOST:PORT', help="also push the inputs over udp like PUSH_ADDR of main.go")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,137 @@
+# load generator for the input server: hundreds of phones moving their stick like client.html
+# every phone takes a player with /assign and sends /input at 8 Hz over its own keep-alive connection
+# one game polls the roster as fast as the games do and reports how long an input takes to show up there
+# python inputServer.py --players 500 & python phoneSwarm.py --phones 500
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import urllib.parse
+import numpy as np
+
+class Connection:
+    def __init__(self, url):
+        self.url = urllib.parse.urlsplit(url)
+        self.reader = None
+        self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.url.hostname, self.url.port or 80)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.url.hostname}\r\n\r\n".encode())
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        return status, await self.reader.readexactly(length)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+class Swarm:
+    def __init__(self, args):
+        self.args = args
+        self.sent = 0
+        self.errors = 0
+        self.unassigned = 0
+        self.requestTimes = [] # seconds per /input request
+        self.polls = 0
+        self.probeSent = {} # input string of the probe phone -> time it was sent
+        self.probeLatency = [] # seconds from sending to seeing it in the roster
+        self.probe = None # player id of the probe phone
+
+    async def phone(self, n, end):
+        connection = Connection(self.args.url)
+        try:
+            status, body = await connection.get('/assign')
+            if status != 200:
+                self.unassigned += 1
+                return
+            assignment = json.loads(body)
+            password = assignment["password"]
+            if n == 0:
+                self.probe = assignment["id"]
+
+            angle = random.uniform(0, 2*math.pi)
+            next = time.perf_counter() + random.uniform(0, 1/self.args.hz) # spread the phones over the period
+            sequence = 0
+            while next < end:
+                await asyncio.sleep(max(0, next - time.perf_counter()))
+                next += 1/self.args.hz
+
+                angle += random.gauss(0, 0.3)
+                x, y = math.cos(angle), math.sin(angle)
+                if n == 0: # unique inputs to recognize them in the roster
+                    sequence += 1
+                    x = (sequence % 1000) / 1000
+                value = f"{x:.3f},{y:.3f}"
+
+                start = time.perf_counter()
+                if n == 0:
+                    self.probeSent[value] = start
+                status, body = await connection.get(f'/input?pw={password}&input={value}')
+                self.requestTimes.append(time.perf_counter() - start)
+                if status == 202:
+                    self.sent += 1
+                else:
+                    self.errors += 1
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            self.errors += 1
+        finally:
+            connection.close()
+
+    # polls the roster like HttpInput, the next request as soon as the last one is done
+    async def game(self, end):
+        connection = Connection(self.args.url)
+        try:
+            while time.perf_counter() < end:
+                status, body = await connection.get('/input')
+                roster = json.loads(body)
+                seen = time.perf_counter()
+                self.polls += 1
+                if self.probe is not None:
+                    sent = self.probeSent.pop(roster[self.probe]["input"], None)
+                    if sent is not None:
+                        self.probeLatency.append(seen - sent)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            self.errors += 1
+        finally:
+            connection.close()
+
+    async def run(self):
+        start = time.perf_counter()
+        end = start + self.args.seconds
+        await asyncio.gather(self.game(end), *(self.phone(n, end) for n in range(self.args.phones)))
+        return time.perf_counter() - start
+
+def percentiles(seconds):
+    if len(seconds) == 0:
+        return "-"
+    p50, p99 = np.percentile(np.array(seconds) * 1000, [50, 99])
+    return f"p50 {p50:.2f} ms, p99 {p99:.2f} ms"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--phones', type=int, default=200)
+    parser.add_argument('--hz', type=float, default=8) # client.html sends 8 inputs per second
+    parser.add_argument('--seconds', type=float, default=20)
+    args = parser.parse_args()
+
+    swarm = Swarm(args)
+    took = asyncio.run(swarm.run())
+    print(f"phones: {args.phones - swarm.unassigned} assigned, {swarm.unassigned} without a free player")
+    print(f"inputs: {swarm.sent / took:.0f}/s of {(args.phones - swarm.unassigned) * args.hz:.0f}/s wanted, {swarm.errors} errors")
+    print(f"input request: {percentiles(swarm.requestTimes)}")
+    print(f"game: {swarm.polls / took:.0f} roster polls/s")
+    print(f"input to game: {percentiles(swarm.probeLatency)}")
@@ -0,0 +1,32 @@
+# stand-in for the input server when testing the udp input of the games without phones
+# pushes the same records as main.go with PUSH_ADDR set, every player moves the stick in a circle
+# python udpPusher.py --players 20 --hz 8, then start a game with --udp
+import argparse
+import math
+import socket
+import time
+import numpy as np
+
+inputRecord = np.dtype([('id', '<u2'), ('x', 'i1'), ('y', 'i1'), ('time', '<f8')])
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--host', default='127.0.0.1')
+parser.add_argument('--port', type=int, default=9999)
+parser.add_argument('--players', type=int, default=20)
+parser.add_argument('--hz', type=float, default=8) # the phones send 8 inputs per second
+args = parser.parse_args()
+
+sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+records = np.zeros(args.players, dtype=inputRecord)
+records['id'] = np.arange(args.players)
+phase = np.linspace(0, 2*math.pi, args.players, endpoint=False)
+
+start = time.time()
+while True:
+    current = time.time()
+    angle = phase + (current - start) * 0.5
+    records['x'] = np.round(np.cos(angle) * 127)
+    records['y'] = np.round(np.sin(angle) * 127)
+    records['time'] = current
+    sock.sendto(records.tobytes(), (args.host, args.port))
+    time.sleep(1 / args.hz)
@@ -0,0 +1,36 @@
+# compares N sumo matches batched into one MultiPlayer against N separate engines
+# run from anywhere: python bench/arenas.py
+import os
+import sys
+import time
+import taichi as ti
+
+gameDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Games', 'SumoRing')
+sys.path.insert(0, gameDir)
+from sumoEngine import SumoEngine
+from engine import Arenas, inputs
+
+ti.init(arch=ti.cpu)
+
+arenaCounts = [1, 4, 16]
+players = 20
+gameSeconds = 20 # game time played by every match
+
+def separate(arenas):
+    engines = [SumoEngine(players, inputs.IdleInput(), seed=a) for a in range(arenas)]
+    start = time.perf_counter()
+    for engine in engines:
+        engine.run(gameSeconds)
+    return time.perf_counter() - start
+
+def batched(arenas):
+    batch = Arenas(SumoEngine, arenas, players, [inputs.IdleInput() for a in range(arenas)], seed=0)
+    start = time.perf_counter()
+    batch.run(gameSeconds)
+    return time.perf_counter() - start
+
+print(f"{'arenas':>7} {'separate match-s/s':>19} {'batched match-s/s':>18}")
+for arenas in arenaCounts:
+    s = separate(arenas)
+    b = batched(arenas)
+    print(f"{arenas:>7} {arenas * gameSeconds / s:>19.1f} {arenas * gameSeconds / b:>18.1f}")
@@ -0,0 +1,72 @@
+# counts the bytes moved between python and the sim per frame of every game
+# to_numpy and from_numpy copy whole fields, ndarray kernel arguments move the numpy arrays handed to the kernels,
+# on the cpu the kernels read and write that memory in place, a gpu backend would transfer all of it
+# run from anywhere: python bench/copies.py
+import os
+import sys
+import numpy as np
+import taichi as ti
+from taichi.lang.field import ScalarField
+from taichi.lang.matrix import MatrixField
+
+gamesDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Games')
+for game in ('SumoRing', 'DeathZones', 'TopDownRace'):
+    sys.path.insert(0, os.path.join(gamesDir, game))
+from sumoEngine import SumoEngine
+from deathZonesEngine import DeathZonesEngine
+from raceEngine import RaceEngine
+from engine import inputs
+games = [('SumoRing', SumoEngine), ('DeathZones', DeathZonesEngine), ('TopDownRace', RaceEngine)]
+
+ti.init(arch=ti.cpu)
+
+players = 20
+frames = 600
+
+copies = {'to_numpy': [0, 0], 'from_numpy': [0, 0], 'ndarray': [0, 0]} # calls, bytes
+
+# wrap the field copies to count them
+def counted(cls, name):
+    original = getattr(cls, name)
+    def copy(self, *args, **kwargs):
+        result = original(self, *args, **kwargs)
+        array = result if name == 'to_numpy' else args[0]
+        copies[name][0] += 1
+        copies[name][1] += np.asarray(array).nbytes
+        return result
+    setattr(cls, name, copy)
+
+for cls in (ScalarField, MatrixField):
+    counted(cls, 'to_numpy')
+    counted(cls, 'from_numpy')
+
+# wrap every kernel of the sim to count the numpy arrays it gets
+def count_kernels(multiPlayer):
+    for name, member in vars(type(multiPlayer)).items():
+        if getattr(member, '_is_wrapped_kernel', False):
+            setattr(multiPlayer, name, counted_kernel(getattr(multiPlayer, name)))
+
+def counted_kernel(original):
+    def launch(*args):
+        arrays = [arg for arg in args if isinstance(arg, np.ndarray)]
+        if arrays:
+            copies['ndarray'][0] += 1
+            copies['ndarray'][1] += sum(array.nbytes for array in arrays)
+        return original(*args)
+    return launch
+
+print(f"{'game':>12} {'copy':>11} {'calls/frame':>12} {'bytes/frame':>12}")
+for game, engineClass in games:
+    engine = engineClass(players, inputs.BotInput(seed=0), seed=0)
+    count_kernels(engine.multiPlayer)
+
+    for name in copies:
+        copies[name] = [0, 0]
+    frame = 0
+    while engine.running and frame < frames:
+        engine.step(1/60)
+        engine.multiPlayer.hostCenters # what the frontends read for the labels
+        frame += 1
+
+    for name, (calls, bytes) in copies.items():
+        print(f"{game:>12} {name:>11} {calls / frame:>12.2f} {bytes / frame:>12.1f}")
@@ -0,0 +1,112 @@
+# catches slowdowns of the sim before they reach an event
+# runs kernels.py and compares it against the baseline stored for this machine in the user cache, eg. ~/.cache/softBodyOlympics/baselines
+# exits with 1 and lists what got slower when a median or p99 time, a compile time or the peak memory regressed
+# a regression has to show up in every retry, each measurement counts with its best run, like for the baseline
+# python bench/gate.py --update stores the baseline, python bench/gate.py compares against it
+# the arguments after -- go to kernels.py, eg. python bench/gate.py -- --players 20,100, a baseline only compares with runs of the same arguments
+import os
+import sys
+import json
+import hashlib
+import argparse
+import tempfile
+import subprocess
+
+benchDir = os.path.dirname(os.path.abspath(__file__))
+# outside the repository, like the offline cache of taichi, the baselines belong to the machine and not to the code
+baselineDir = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'softBodyOlympics', 'baselines')
+
+# the same machine and software versions give the same fingerprint, results of other machines are not comparable
+def fingerprint(machine):
+    return hashlib.sha1(json.dumps(machine, sort_keys=True).encode()).hexdigest()[:12]
+
+def run_suite(suiteArgs):
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, 'results.json')
+        # without the offline cache every run compiles, so the compile times compare
+        subprocess.run([sys.executable, os.path.join(benchDir, 'kernels.py'), '--no-cache', '--out', out] + suiteArgs, check=True)
+        with open(out) as f:
+            return json.load(f)
+
+# every measurement as name -> (value, threshold, floor), only names in both runs get compared
+# a regression has to be slower by the threshold and by the floor, the p99 of kernels under a millisecond jitters
+def measurements(run, args):
+    values = {}
+    if "runs" in run: # several runs, the best of them counts
+        for single in run["runs"]:
+            for name, (value, threshold, floor) in measurements(single, args).items():
+                if name not in values or value < values[name][0]:
+                    values[name] = (value, threshold, floor)
+        return values
+
+    for r in run["results"]:
+        name = f"{r['kernel']} {r['players']}p {r['mesh']} {r['layout']}"
+        values[name + " p50 ms"] = (r["p50_ms"], args.threshold, args.floor)
+        values[name + " p99 ms"] = (r["p99_ms"], args.p99Threshold, args.floor)
+    for c in run["compiles"]:
+        values[f"compile {c['players']}p {c['mesh']} s"] = (c["compile_s"], args.threshold, 0.5)
+    values["peak rss MB"] = (run["peak_rss_mb"], args.threshold, 16)
+    return values
+
+def compare(baseline, run, args):
+    old = measurements(baseline, args)
+    new = measurements(run, args)
+    rows = []
+    for name, (value, threshold, floor) in new.items():
+        if name not in old:
+            continue
+        base = old[name][0]
+        change = value / base - 1 if base > 0 else 0
+        rows.append((name, base, value, change, change > threshold and value - base > floor))
+    return rows
+
+def report(rows):
+    width = max(len(name) for name, *_ in rows)
+    print(f"{'':2}{'measurement':<{width}} {'baseline':>10} {'now':>10} {'change':>8}")
+    for name, base, value, change, regressed in rows:
+        print(f"{'!!' if regressed else '':2}{name:<{width}} {base:>10.3f} {value:>10.3f} {change:>+8.1%}")
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    suiteArgs = argv[argv.index('--') + 1:] if '--' in argv else ['--quick', '--repeats', '200']
+    argv = argv[:argv.index('--')] if '--' in argv else argv
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--update', action='store_true', help="store this run as the baseline of the machine")
+    parser.add_argument('--threshold', type=float, default=0.15, help="allowed slowdown of medians, compile times and memory")
+    parser.add_argument('--p99-threshold', dest='p99Threshold', type=float, default=0.30, help="allowed slowdown of the p99 times")
+    parser.add_argument('--floor', type=float, default=0.2, help="milliseconds a kernel time has to get slower at least")
+    parser.add_argument('--runs', type=int, default=3, help="runs of the suite for a new baseline")
+    parser.add_argument('--retries', type=int, default=2, help="extra runs to confirm regressions")
+    args = parser.parse_args(argv)
+
+    runs = [run_suite(suiteArgs)]
+    machine = runs[0]["machine"]
+    os.makedirs(baselineDir, exist_ok=True)
+    path = os.path.join(baselineDir, fingerprint(machine) + '.json')
+
+    if args.update or not os.path.exists(path):
+        runs += [run_suite(suiteArgs) for _ in range(args.runs - 1)]
+        with open(path, 'w') as f:
+            json.dump({"machine": machine, "suite": suiteArgs, "runs": runs}, f, indent=1)
+        print(f"Stored the baseline of {len(runs)} runs for {machine['processor']} in {path}")
+        sys.exit(0)
+
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline["suite"] != suiteArgs: # other players, repeats or meshes measure something else
+        print(f"The baseline in {path} was run with {' '.join(baseline['suite'])}, not with {' '.join(suiteArgs)}")
+        print("Run the gate with the same arguments after --, or store a baseline for these with --update")
+        sys.exit(2)
+    rows = compare(baseline, {"runs": runs}, args)
+    while any(row[4] for row in rows) and len(runs) <= args.retries:
+        print("Regressions found, running the suite again to confirm them")
+        runs.append(run_suite(suiteArgs))
+        rows = compare(baseline, {"runs": runs}, args)
+    report(rows)
+
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"{len(regressions)} of {len(rows)} measurements regressed, see the lines marked with !!")
+        sys.exit(1)
+    print(f"No regressions in {len(rows)} measurements")
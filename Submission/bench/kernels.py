@@ -0,0 +1,138 @@
+# times the MultiPlayer kernels for different player counts, the meshes of all games and layouts, without window or network
+# spread: the players stand apart like at the start of a match, clustered: everyone pushed into a pile in the middle
+# prints a table and writes all results with percentiles, compile times and the peak memory as json
+# the baseline for every optimization, gate.py compares runs against it
+# run from anywhere: python bench/kernels.py --out results.json, --quick for a short run
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import numpy as np
+import taichi as ti
+
+gamesDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Games')
+sys.path.insert(0, gamesDir)
+from engine import Engine, load_mesh, multiplayer as mpl
+
+dt = Engine.timeScale / 60 / Engine.epochs # one substep of a 60 fps frame
+
+# the meshes of all games by file name, games share some of them
+def find_meshes():
+    meshes = {}
+    for game in sorted(os.listdir(gamesDir)):
+        meshDir = os.path.join(gamesDir, game, 'flubuMeshes')
+        if os.path.isdir(meshDir):
+            for name in sorted(os.listdir(meshDir)):
+                if name.endswith('.npy'):
+                    meshes.setdefault(name, os.path.join(meshDir, name))
+    return meshes
+
+# seconds per call of fn, synced so the kernel time is measured and not only the launch
+def measure(fn, repeats):
+    fn() # kernels that warm_up leaves out compile on their first call
+    ti.sync()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        ti.sync()
+        times.append(time.perf_counter() - start)
+    return np.array(times)
+
+# steps is the number of substeps per call, None for the kernels of the game rules
+def summary(times, verts, steps):
+    p50, p90, p99 = np.percentile(times, [50, 90, 99]) * 1000
+    mean = times.mean()
+    result = {"p50_ms": p50, "p90_ms": p90, "p99_ms": p99, "mean_ms": mean * 1000, "calls_per_s": 1 / mean}
+    if steps:
+        result["substeps_per_s"] = steps / mean
+        result["vert_steps_per_s"] = verts * steps / mean
+    return result
+
+# push every player towards the middle until they pile up like in the end of a sumo match
+def cluster(multiPlayer, frames):
+    for _ in range(frames):
+        toMiddle = -multiPlayer.hostCenters
+        norm = np.linalg.norm(toMiddle, axis=1, keepdims=True)
+        multiPlayer.set_input((toMiddle / np.maximum(norm, 1e-6)).astype(np.float32))
+        multiPlayer.advance_frame(dt, Engine.epochs)
+    multiPlayer.set_input(np.zeros((multiPlayer.playerCount, 2), dtype=np.float32))
+
+def bench(players, mesh, args):
+    points, links = load_mesh(args.meshFiles.get(mesh, mesh)) # a name of a game mesh or a path
+    # keep the density of the 20 player sumo ring, the map is centered on 0, 0
+    mapSize = Engine.mapSize * max(1, players / 20)**0.5
+    start = time.perf_counter()
+    multiPlayer = mpl.MultiPlayer(playerCount=players, speed=Engine.speed, meshes=[(points, links)])
+    multiPlayer.init(mapSize, -mapSize/2, -mapSize/2)
+    multiPlayer.warm_up()
+    setup = {"players": players, "mesh": mesh, "compile_s": time.perf_counter() - start}
+
+    results = []
+    for layout in ['spread', 'clustered']:
+        if layout == 'clustered':
+            cluster(multiPlayer, args.settle)
+        multiPlayer.update_players(multiPlayer.hostCenters, multiPlayer.hostVertsActive)
+        verts = multiPlayer.activeVertCount[0]
+        far = mapSize * 10 # the passes run over every vert but nothing gets destroyed or pushed
+        kernels = {
+            "advance": (lambda: multiPlayer.advance(dt, multiPlayer.hostCenters, multiPlayer.hostVertsActive), 1),
+            "frame": (lambda: multiPlayer.advance_frame(dt, Engine.epochs), Engine.epochs),
+            "destruction": (lambda: multiPlayer.destruction(0.0, 0.0, far, 1, -1), None),
+            "killBorders": (lambda: multiPlayer.killBorders(-far, -far, 2*far, -1), None),
+            "bombExplosion": (lambda: multiPlayer.bombExplosion(far, far, -1), None),
+        }
+        for kernel, (fn, steps) in kernels.items():
+            times = measure(fn, args.repeats)
+            results.append({"players": players, "mesh": mesh, "layout": layout, "kernel": kernel,
+                            "verts": int(verts), "links": int(multiPlayer.linkCount), **summary(times, verts, steps)})
+    return results, setup
+
+def machine():
+    return {"platform": platform.platform(), "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count(), "python": platform.python_version(), "taichi": ".".join(map(str, ti.__version__))}
+
+if __name__ == "__main__":
+    meshFiles = find_meshes()
+    meshes = sorted(meshFiles)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', help="comma separated player counts, default 1,20,100,500")
+    parser.add_argument('--meshes', help="comma separated files of the flubuMeshes of any game or paths to meshes, default all")
+    parser.add_argument('--repeats', type=int, help="timed calls per kernel, default 200")
+    parser.add_argument('--settle', type=int, help="frames to push the players into a pile, default 120")
+    parser.add_argument('--quick', action='store_true', help="20 and 100 players, one mesh, fewer repeats and settle frames")
+    parser.add_argument('--no-cache', dest='cache', action='store_false', help="compile every kernel, for the compile times")
+    parser.add_argument('--out', help="write the results as json")
+    args = parser.parse_args()
+    args.meshFiles = meshFiles
+    # --quick only changes the defaults, options that were passed stay
+    defaults = {'players': '1,20,100,500', 'meshes': ','.join(meshes), 'repeats': 200, 'settle': 120}
+    if args.quick:
+        defaults = {'players': '20,100', 'meshes': Engine.mesh, 'repeats': 50, 'settle': 60}
+    for name, value in defaults.items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+
+    ti.init(arch=ti.cpu, offline_cache=args.cache)
+
+    results = []
+    compiles = [] # seconds to set up and warm up the sim of every player count and mesh
+    print(f"{'players':>7} {'mesh':>18} {'layout':>9} {'kernel':>13} {'p50 ms':>8} {'p99 ms':>8} {'Mvert-steps/s':>14}")
+    for players in map(int, args.players.split(',')):
+        for mesh in args.meshes.split(','):
+            configResults, setup = bench(players, mesh, args)
+            compiles.append(setup)
+            for r in configResults:
+                results.append(r)
+                vertSteps = f"{r['vert_steps_per_s'] / 1e6:.2f}" if 'vert_steps_per_s' in r else '-'
+                print(f"{r['players']:>7} {r['mesh']:>18} {r['layout']:>9} {r['kernel']:>13} "
+                      f"{r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {vertSteps:>14}")
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({"machine": machine(), "arch": "cpu", "dt": dt, "repeats": args.repeats, "cache": args.cache,
+                       "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, # kB on linux
+                       "compiles": compiles, "results": results}, f, indent=1)
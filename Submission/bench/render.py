@@ -0,0 +1,77 @@
+# compares drawing the dots and springs with a new Batch every frame against the retained Renderer
+# run from anywhere: python bench/render.py, add --headless to render offscreen without a display (EGL)
+# for a software GL driver run it with LIBGL_ALWAYS_SOFTWARE=1
+import os
+import sys
+import time
+import numpy as np
+import pyglet
+
+if '--headless' in sys.argv:
+    pyglet.options['headless'] = True
+
+import taichi as ti
+
+gameDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Games', 'SumoRing')
+sys.path.insert(0, gameDir)
+from sumoEngine import SumoEngine
+from engine import inputs
+from engine.renderer import Renderer
+
+ti.init(arch=ti.cpu)
+
+players = 20
+frames = 600
+screenRes = 1000
+
+window = pyglet.window.Window(width=screenRes, height=screenRes, visible=False)
+window.switch_to()
+window.on_resize(screenRes, screenRes)
+
+engine = SumoEngine(players, inputs.IdleInput(), seed=0)
+multiPlayer = engine.multiPlayer
+multiPlayer.interpolate(1.0)
+renderScale = screenRes / engine.mapSize
+triangle = np.array([-5.0, -2.0, 0.0, 7.0, 5.0, -2.0], dtype=np.float32).reshape(3,2) * 2
+
+# the old path: extract into numpy and hand copies to a fresh batch
+dotBuffer = np.zeros((multiPlayer.vertCount * 3, 2), dtype=np.float32)
+dotColorBuffer = np.zeros((multiPlayer.vertCount * 3, 3), dtype=np.uint8)
+lineBuffer = np.zeros((multiPlayer.linkCount * 2, 2), dtype=np.float32)
+renderCounts = np.zeros(2, dtype=np.int32)
+
+def batch_frame():
+    batch = pyglet.graphics.Batch()
+    multiPlayer.render_buffers(engine.mapOffset[0], engine.mapOffset[1], renderScale, triangle,
+        dotBuffer, dotColorBuffer, lineBuffer, renderCounts)
+    count, linkCount = renderCounts
+    batch.add(linkCount * 2, pyglet.gl.GL_LINES, None,
+        ('v2f', lineBuffer[:linkCount * 2].ravel()),
+        ('c3B', (20,20,20) * (linkCount * 2)))
+    batch.add(count * 3, pyglet.gl.GL_TRIANGLES, None,
+        ('v2f', dotBuffer[:count * 3].ravel()),
+        ('c3B', dotColorBuffer[:count * 3].ravel()))
+    batch.draw()
+
+renderer = Renderer(multiPlayer, triangle)
+
+def retained_frame():
+    renderer.draw(engine.mapOffset[0], engine.mapOffset[1], renderScale)
+
+# milliseconds per frame, glFinish so the driver work is counted as well
+def measure(frame):
+    times = []
+    for f in range(frames):
+        start = time.perf_counter()
+        window.clear()
+        frame()
+        pyglet.gl.glFinish()
+        times.append(time.perf_counter() - start)
+    times = np.array(times[frames//10:]) * 1000 # skip the warm up
+    return np.median(times), np.percentile(times, 99)
+
+print(pyglet.gl.gl_info.get_renderer())
+print(f"{'path':>9} {'median ms':>10} {'p99 ms':>8}")
+for name, frame in [('batch', batch_frame), ('retained', retained_frame)]:
+    median, p99 = measure(frame)
+    print(f"{name:>9} {median:>10.3f} {p99:>8.3f}")
@@ -0,0 +1,52 @@
+# startup of a 20 player sumo match, once with an empty taichi offline cache and once with the filled one
+# every start is a new python process, the times are split into the phases of a game start
+# run from anywhere: python bench/startup.py
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+gameDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Games', 'SumoRing')
+
+# what one start does, prints the seconds per phase as json
+child = '''
+import json, sys, time
+phases = {}
+start = time.perf_counter()
+import taichi as ti
+phases['import taichi'] = time.perf_counter() - start
+
+start = time.perf_counter()
+ti.init(arch=ti.cpu, offline_cache=True, offline_cache_file_path=sys.argv[1])
+phases['ti.init'] = time.perf_counter() - start
+
+from sumoEngine import SumoEngine
+from engine import inputs
+start = time.perf_counter()
+engine = SumoEngine(20, inputs.BotInput(seed=0), seed=0) # init and warm up
+phases['engine'] = time.perf_counter() - start
+
+start = time.perf_counter()
+engine.step(1/60)
+phases['first frame'] = time.perf_counter() - start
+
+start = time.perf_counter()
+engine.restart()
+engine.step(1/60)
+phases['next round'] = time.perf_counter() - start
+print(json.dumps(phases))
+'''
+
+def start_game(cache):
+    result = subprocess.run([sys.executable, '-c', child, cache], cwd=gameDir, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+with tempfile.TemporaryDirectory() as cache:
+    cold = start_game(cache)
+    warm = start_game(cache)
+
+print(f"{'phase':>14} {'cold s':>8} {'warm s':>8}")
+for phase in cold:
+    print(f"{phase:>14} {cold[phase]:>8.3f} {warm[phase]:>8.3f}")
+print(f"{'total':>14} {sum(cold.values()):>8.3f} {sum(warm.values()):>8.3f}")
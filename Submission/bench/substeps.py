@@ -0,0 +1,72 @@
+# compares MultiPlayer.advance_n against calling advance once per substep
+# and the frame with parallel passes, one launch per substep, advance_frame picks between that and advance_n
+# run from anywhere: python bench/substeps.py, --threads 1,4 to compare cpu thread counts, each needs its own process
+import os
+import sys
+import time
+import argparse
+import subprocess
+import numpy as np
+import taichi as ti
+
+gamesDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Games')
+sys.path.insert(0, gamesDir)
+from engine import multiplayer as mpl
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--threads', help="comma separated cpu thread counts, all threads of the machine by default")
+args = parser.parse_args()
+if args.threads and ',' in args.threads:
+    for threads in args.threads.split(','):
+        subprocess.run([sys.executable, __file__, '--threads', threads], check=True)
+    sys.exit(0)
+
+if args.threads:
+    ti.init(arch=ti.cpu, cpu_max_num_threads=int(args.threads))
+else:
+    ti.init(arch=ti.cpu)
+threads = ti.cfg.cpu_max_num_threads
+
+playerCounts = [20, 200]
+substeps = [1, 10, 50]
+frames = 50 # timed frames per configuration
+dt = 0.001
+
+with open(os.path.join(gamesDir, 'SumoRing', 'flubuMeshes', 'bigRoundRested.npy'), 'rb') as f:
+    pos_loaded = np.load(f)
+    edges_loaded = np.load(f)
+
+def loop(multiPlayer, steps):
+    for _ in range(steps):
+        multiPlayer.advance(dt, multiPlayer.hostCenters, multiPlayer.hostVertsActive)
+
+def fused(multiPlayer, steps):
+    multiPlayer.advance_n(dt, steps, multiPlayer.hostCenters, multiPlayer.hostVertsActive)
+
+def parallel(multiPlayer, steps):
+    multiPlayer.fused = False
+    multiPlayer.advance_frame(dt, steps)
+
+print(f"{threads} cpu threads")
+print(f"{'players':>8} {'substeps':>9} {'loop ms':>9} {'fused ms':>9} {'parallel ms':>12} {'speedup':>8}")
+for players in playerCounts:
+    # keep the density of the 20 player sumo ring
+    mapSize = 60 * (players / 20)**0.5
+    results = {}
+    for mode in [loop, fused, parallel]:
+        multiPlayer = mpl.MultiPlayer(playerCount=players, meshes=[(pos_loaded, edges_loaded)])
+        multiPlayer.init(mapSize, -mapSize/2, -mapSize/2)
+        multiPlayer.set_input(np.random.uniform(-1, 1, (players, 2)).astype(np.float32))
+
+        for steps in substeps:
+            mode(multiPlayer, steps) # compile and warm up
+            ti.sync()
+            start = time.perf_counter()
+            for _ in range(frames):
+                mode(multiPlayer, steps)
+            ti.sync()
+            results[mode.__name__, steps] = (time.perf_counter() - start) / frames * 1000
+
+    for steps in substeps:
+        l, f, p = results['loop', steps], results['fused', steps], results['parallel', steps]
+        print(f"{players:>8} {steps:>9} {l:>9.3f} {f:>9.3f} {p:>12.3f} {l/f:>7.2f}x")